@@ -0,0 +1,187 @@
+# Mede os caminhos quentes da aplicação sem servidor, sobre bancos sintéticos de
+# dados_sinteticos.py em várias escalas: carregadores (cache frio e quente), Kanban, prazos,
+# busca, histórico (burndown, ciclo), previsão por lote, exportação Excel, relatório HTML, figuras do painel, salvamentos
+# do Diário de Bordo e cadastro de lote em massa.
+# O resultado vai para um JSON (--saida) e pode ser comparado com uma execução anterior
+# (--comparar), para achar regressões entre versões.
+#
+# uso: python benchmarks/bench_carga.py [--escalas 1000 10000 100000] [--repeticoes 3]
+#                                       [--saida resultado.json] [--comparar anterior.json]
+import argparse
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import cache  # noqa: E402
+import db  # noqa: E402
+from busca import buscar  # noqa: E402
+from cadastro import inserir_lote  # noqa: E402
+from dados import carregar_dados, carregar_pendencias, carregar_pendencias_status, carregar_resumo_lotes, \
+    indice_rotulos_reformas, carregar_cores_status  # noqa: E402
+from dados_sinteticos import gerar_banco  # noqa: E402
+from exportacao import exportar_excel  # noqa: E402
+from historico import burndown, ciclo_por_gestor, vazao_semanal  # noqa: E402
+from kanban import html_coluna  # noqa: E402
+from painel import figura_agregada, figura_lote  # noqa: E402
+from prazos import carregar_pendencias_prazos, contar_prazos  # noqa: E402
+from previsao import previsao_lotes  # noqa: E402
+from relatorio import escrever_relatorio_html  # noqa: E402
+
+HOJE = date.today().isoformat()
+LINHAS_LOTE = 1000  # tamanho da planilha do cadastro em massa
+SALVAMENTOS = 100  # atualizações de status/progresso, uma transação cada, como no Diário de Bordo
+
+
+# --- ETAPAS ---
+# Cada etapa recebe o contexto da escala (frames já carregados, pasta temporária, repetição)
+# e devolve o número de linhas processadas. `frio`: o cache de consultas é limpo antes.
+def _excel(ctx):
+    caminho = os.path.join(ctx['pasta'], 'bench.xlsx')
+    try:
+        return sum(exportar_excel(caminho).values())
+    finally:
+        os.remove(caminho)
+
+
+def _relatorio_html(ctx):
+    saida = io.StringIO()
+    escrever_relatorio_html(ctx['pendencias'], saida, date.fromisoformat(HOJE))
+    return len(ctx['pendencias'])
+
+
+def _figuras_lote(ctx):
+    df, cores = ctx['reformas'], ctx['cores']
+    lotes = sorted(df['lote'].unique())[:10]
+    for lote in lotes:
+        figura_lote(df[df['lote'] == lote], lote, cores).to_json()
+    return int(df['lote'].isin(lotes).sum())
+
+
+def _figura_resumo(ctx):
+    lotes = tuple(sorted(ctx['reformas']['lote'].unique()))
+    figura_agregada(lotes, "Resumo").to_json()
+    return len(lotes)
+
+
+def _salvar_diario(ctx):
+    # Alterna status/progresso: cada UPDATE passa pelos triggers de log, resumo e histórico
+    ids = ctx['reformas']['id'].head(SALVAMENTOS).tolist()
+    status = ('Em Andamento', 'Concluído')[ctx['repeticao'] % 2]
+    for i in ids:
+        db.executar("UPDATE reformas SET status=?, progresso=? WHERE id=?", (status, 50 + ctx['repeticao'], i))
+    return len(ids)
+
+
+def _inserir_lote(ctx):
+    grade = pd.DataFrame({'Frota': [f"B{ctx['repeticao']}-{i}" for i in range(LINHAS_LOTE)],
+                          'Modelo': 'JD 8R', 'Obs': ''})
+    return inserir_lote(f"BENCH {ctx['repeticao']}", 'BRUNO', date.today(), grade)['inseridas']
+
+
+ETAPAS = [
+    ('carregar_dados', True, lambda ctx: len(carregar_dados())),
+    ('carregar_dados (cache)', False, lambda ctx: len(carregar_dados())),
+    ('carregar_pendencias', True, lambda ctx: len(carregar_pendencias())),
+    ('carregar_resumo_lotes', True, lambda ctx: len(carregar_resumo_lotes())),
+    ('indice_rotulos_reformas', True, lambda ctx: len(indice_rotulos_reformas())),
+    ('kanban: carregar A Fazer', True, lambda ctx: len(carregar_pendencias_status('A Fazer', hoje=HOJE))),
+    ('kanban: html_coluna', False, lambda ctx: len(html_coluna(ctx['afazer'])) and len(ctx['afazer'])),
+    ('prazos: contar_prazos', True, lambda ctx: sum(contar_prazos(HOJE).values())),
+    ('busca: buscar', True, lambda ctx: len(buscar('bomba'))),
+    ('exportar_excel', False, _excel),
+    ('relatorio_html', False, _relatorio_html),
+    ('painel: figuras de 10 lotes', False, _figuras_lote),
+    ('painel: figura resumo', True, _figura_resumo),
+    ('historico: burndown 10 lotes', True, lambda ctx: len(burndown(ctx['lotes10']))),
+    ('historico: vazao_semanal', True, lambda ctx: len(vazao_semanal())),
+    ('historico: ciclo_por_gestor', True, lambda ctx: len(ciclo_por_gestor())),
+    ('previsao: previsao_lotes', True, lambda ctx: len(previsao_lotes(HOJE))),
+    ('diario: 100 salvamentos', False, _salvar_diario),  # escreve
+    ('inserir_lote (1000 linhas)', False, _inserir_lote),  # escreve: fica por último
+]
+
+
+def _versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def medir_escala(n, repeticoes, pasta):
+    caminho = os.path.join(pasta, f"sintetico_{n}.sqlite")
+    geracao = gerar_banco(caminho, n)
+    db.trocar_banco(caminho)
+    cache.limpar()
+    ctx = {'pasta': pasta, 'reformas': carregar_dados(), 'pendencias': carregar_pendencias_prazos(HOJE),
+           'afazer': carregar_pendencias_status('A Fazer', hoje=HOJE), 'cores': carregar_cores_status()}
+    ctx['lotes10'] = tuple(sorted(ctx['reformas']['lote'].unique())[:10])
+    resultados = [{'escala': n, 'etapa': 'gerar_banco', 'segundos': round(geracao['segundos'], 4),
+                   'mediana_s': round(geracao['segundos'], 4), 'linhas': n * 2}]
+    for nome, frio, func in ETAPAS:
+        tempos, linhas = [], 0
+        for r in range(repeticoes):
+            ctx['repeticao'] = r
+            if frio: cache.limpar()
+            t0 = time.perf_counter()
+            linhas = func(ctx)
+            tempos.append(time.perf_counter() - t0)
+        resultados.append({'escala': n, 'etapa': nome, 'segundos': round(min(tempos), 6),
+                           'mediana_s': round(statistics.median(tempos), 6), 'linhas': int(linhas)})
+    db.get_pool().fechar()
+    return resultados
+
+
+def executar(escalas=(1000, 10000, 100000), repeticoes=3):
+    with tempfile.TemporaryDirectory() as pasta:
+        resultados = []
+        for n in escalas:
+            resultados += medir_escala(n, repeticoes if n < 100000 else 1, pasta)
+    return {'gerado_em': datetime.now().isoformat(timespec='seconds'), 'commit': _versao_codigo(),
+            'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+            'pandas': pd.__version__, 'repeticoes': repeticoes, 'resultados': resultados}
+
+
+def comparar(atual, anterior):
+    # (escala, etapa, antes, agora, razão) para as etapas presentes nos dois relatórios
+    antes = {(r['escala'], r['etapa']): r['segundos'] for r in anterior['resultados']}
+    return [(r['escala'], r['etapa'], antes[(r['escala'], r['etapa'])], r['segundos'],
+             r['segundos'] / antes[(r['escala'], r['etapa'])] if antes[(r['escala'], r['etapa'])] else None)
+            for r in atual['resultados'] if (r['escala'], r['etapa']) in antes]
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--escalas', type=int, nargs='+', default=[1000, 10000, 100000])
+    ap.add_argument('--repeticoes', type=int, default=3, help="por etapa; a escala de 100 mil roda uma vez")
+    ap.add_argument('--saida', default=None, help="grava o relatório JSON neste arquivo")
+    ap.add_argument('--comparar', default=None, help="relatório JSON anterior para comparação")
+    a = ap.parse_args()
+    rel = executar(a.escalas, a.repeticoes)
+    if a.saida:
+        with open(a.saida, 'w', encoding='utf-8') as f:
+            json.dump(rel, f, ensure_ascii=False, indent=2)
+    print(f"{'escala':>7} {'etapa':<30} {'melhor (s)':>11} {'mediana (s)':>12} {'linhas':>8}")
+    for r in rel['resultados']:
+        print(f"{r['escala']:>7} {r['etapa']:<30} {r['segundos']:>11.4f} {r['mediana_s']:>12.4f} {r['linhas']:>8}")
+    if a.comparar:
+        with open(a.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+        print(f"\ncomparação com {anterior.get('commit') or a.comparar} ({anterior.get('gerado_em')}):")
+        for escala, etapa, t0, t1, razao in comparar(rel, anterior):
+            marca = "  <- mais lento" if razao and razao > 1.2 and t1 - t0 > 0.005 else ""
+            print(f"{escala:>7} {etapa:<30} {t0:>9.4f} -> {t1:>9.4f} ({razao:.2f}x){marca}")
@@ -0,0 +1,103 @@
+# Vários processos (como workers do Streamlit atrás de um proxy) e várias threads por processo
+# gravando no mesmo arquivo SQLite. Cada escrita lê e incrementa o progresso de uma mesma máquina
+# dentro de db.transacao(): ao final o valor tem que ter subido exatamente processos x threads x
+# escritas, senão houve atualização perdida. Mede também a latência das escritas e se o cache de
+# um processo que não escreveu percebe a alteração dos outros (PRAGMA data_version).
+#
+# uso: python benchmarks/bench_concorrencia.py [--processos 4] [--threads 2] [--escritas 200] [--reformas 1000]
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import cache  # noqa: E402
+import db  # noqa: E402
+from dados import carregar_reforma  # noqa: E402
+from dados_sinteticos import gerar_banco  # noqa: E402
+
+ID_MAQUINA = 1
+
+
+def _incrementar(latencias):
+    t0 = time.perf_counter()
+    with db.transacao() as c:
+        v = c.execute("SELECT progresso FROM reformas WHERE id=?", (ID_MAQUINA,)).fetchone()[0]
+        c.execute("UPDATE reformas SET progresso=? WHERE id=?", (v + 1, ID_MAQUINA))
+    latencias.append(time.perf_counter() - t0)
+
+
+def _processo(caminho, threads, escritas, largada, saida):
+    db.trocar_banco(caminho)
+    latencias, erros = [], []
+
+    def rodar():
+        for _ in range(escritas):
+            try:
+                _incrementar(latencias)
+            except Exception as e:
+                erros.append(f"{type(e).__name__}: {e}")
+
+    largada.wait()
+    ts = [threading.Thread(target=rodar) for _ in range(threads)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    db.get_pool().fechar()
+    saida.put((latencias, erros))
+
+
+def executar(processos=4, threads=2, escritas=200, reformas=1000):
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'concorrencia.sqlite')
+        gerar_banco(caminho, reformas)
+        db.trocar_banco(caminho)
+        cache.limpar()
+        inicial = int(carregar_reforma(ID_MAQUINA)['progresso'])  # fica no cache deste processo
+
+        ctx = mp.get_context('spawn')
+        largada, saida = ctx.Barrier(processos + 1), ctx.Queue()
+        ps = [ctx.Process(target=_processo, args=(caminho, threads, escritas, largada, saida)) for _ in range(processos)]
+        for p in ps: p.start()
+        largada.wait()
+        t0 = time.perf_counter()
+        resultados = [saida.get() for _ in ps]
+        segundos = time.perf_counter() - t0
+        for p in ps: p.join()
+
+        time.sleep(db.VERIFICAR_EXTERNAS_S)
+        visto_no_cache = int(carregar_reforma(ID_MAQUINA)['progresso'])
+        with db.conexao() as conn:
+            final = conn.execute("SELECT progresso FROM reformas WHERE id=?", (ID_MAQUINA,)).fetchone()[0]
+        db.get_pool().fechar()
+
+    latencias = sorted(l for lat, _ in resultados for l in lat)
+    erros = [e for _, err in resultados for e in err]
+    esperado = inicial + processos * threads * escritas
+    return {'escritas': len(latencias), 'erros': len(erros), 'primeiro_erro': erros[0] if erros else None,
+            'perdidas': esperado - final - len(erros), 'escritas_por_s': len(latencias) / segundos,
+            'mediana_ms': statistics.median(latencias) * 1000 if latencias else 0.0,
+            'p95_ms': latencias[int(len(latencias) * 0.95)] * 1000 if latencias else 0.0,
+            'max_ms': latencias[-1] * 1000 if latencias else 0.0,
+            'cache_atualizado': visto_no_cache == final}
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--processos', type=int, default=4)
+    ap.add_argument('--threads', type=int, default=2, help="threads gravando em cada processo")
+    ap.add_argument('--escritas', type=int, default=200, help="por thread")
+    ap.add_argument('--reformas', type=int, default=1000, help="tamanho do banco sintético")
+    a = ap.parse_args()
+    r = executar(a.processos, a.threads, a.escritas, a.reformas)
+    print(f"{a.processos} processos x {a.threads} threads x {a.escritas} escritas")
+    print(f"escritas: {r['escritas']} ({r['escritas_por_s']:.0f}/s) | erros: {r['erros']} | perdidas: {r['perdidas']}")
+    print(f"latência: mediana {r['mediana_ms']:.1f} ms | p95 {r['p95_ms']:.1f} ms | máx {r['max_ms']:.1f} ms")
+    print(f"cache do processo que só leu atualizado: {'sim' if r['cache_atualizado'] else 'NÃO'}")
+    if r['primeiro_erro']:
+        print(f"primeiro erro: {r['primeiro_erro']}")
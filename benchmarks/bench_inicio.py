@@ -0,0 +1,87 @@
+# Custo de partida por página: cada medida roda num processo Python novo (sem nada importado), como
+# um worker do Streamlit recém-iniciado. Para cada página de paginas/ mede o import da base que o
+# app.py sempre carrega (streamlit, pandas, dados, cache...), o import incremental do módulo da página
+# e, com --render, a primeira execução completa do app.py com ?pagina=<módulo> (AppTest, banco
+# sintético), que inclui consultas, figuras e o import da página.
+#
+# uso: python benchmarks/bench_inicio.py [--repeticoes 3] [--render] [--reformas 1000] [--saida resultado.json]
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from paginas import PAGINAS  # noqa: E402
+
+# Executado em processo novo: imprime "base pagina render" em segundos
+_MEDIR = """
+import os, sys, time
+sys.path.insert(0, {raiz!r})
+t0 = time.perf_counter()
+import streamlit, pandas, cache, dados, db, instrumentacao, migracoes, trabalhos, paginas
+t1 = time.perf_counter()
+import paginas.{pagina}
+t2 = time.perf_counter()
+render = 0.0
+if {render!r}:
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join({raiz!r}, 'app.py'), default_timeout=120)
+    at.query_params['pagina'] = {pagina!r}
+    if os.environ.get('REFORMA_ADMIN'):
+        at.query_params['admin'] = os.environ['REFORMA_ADMIN']
+    t3 = time.perf_counter()
+    at.run()
+    render = time.perf_counter() - t3
+    assert not at.exception, [e.value for e in at.exception]
+    assert at.sidebar.radio[0].value == next(r for r, m in paginas.PAGINAS.items() if m == {pagina!r})
+print(t1 - t0, t2 - t1, render)
+"""
+
+
+def medir_pagina(pagina, render, ambiente):
+    r = subprocess.run([sys.executable, '-c', _MEDIR.format(raiz=RAIZ, pagina=pagina, render=render)],
+                       capture_output=True, text=True, env=ambiente, cwd=RAIZ, timeout=300)
+    if r.returncode:
+        raise RuntimeError(f"{pagina}: {r.stderr.strip().splitlines()[-1]}")
+    return [float(x) for x in r.stdout.split()[-3:]]
+
+
+def executar(repeticoes=3, render=False, reformas=1000):
+    with tempfile.TemporaryDirectory() as pasta:
+        ambiente = dict(os.environ, REFORMA_ADMIN='bench')  # a página de desempenho só abre com ?admin=
+        if render:
+            from dados_sinteticos import gerar_banco
+            ambiente['REFORMA_DB'] = os.path.join(pasta, 'inicio.sqlite')
+            gerar_banco(ambiente['REFORMA_DB'], reformas)
+        resultados = []
+        for rotulo, pagina in PAGINAS.items():
+            medidas = [medir_pagina(pagina, render, ambiente) for _ in range(repeticoes)]
+            base, pag, ren = (statistics.median(m[i] for m in medidas) for i in range(3))
+            resultados.append({'pagina': pagina, 'rotulo': rotulo, 'base_s': round(base, 4),
+                               'import_pagina_s': round(pag, 4), 'primeira_execucao_s': round(ren, 4) if render else None})
+    return {'gerado_em': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'repeticoes': repeticoes, 'reformas': reformas if render else None, 'resultados': resultados}
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeticoes', type=int, default=3, help="processos por página (mediana)")
+    ap.add_argument('--render', action='store_true', help="mede também a primeira execução do app.py (AppTest)")
+    ap.add_argument('--reformas', type=int, default=1000, help="tamanho do banco sintético do --render")
+    ap.add_argument('--saida', default=None, help="grava o relatório JSON neste arquivo")
+    a = ap.parse_args()
+    rel = executar(a.repeticoes, a.render, a.reformas)
+    if a.saida:
+        with open(a.saida, 'w', encoding='utf-8') as f:
+            json.dump(rel, f, ensure_ascii=False, indent=2)
+    print(f"{'página':<12} {'base (s)':>9} {'página (s)':>11} {'1ª execução (s)':>16}")
+    for r in rel['resultados']:
+        ren = f"{r['primeira_execucao_s']:>16.3f}" if r['primeira_execucao_s'] is not None else f"{'-':>16}"
+        print(f"{r['pagina']:<12} {r['base_s']:>9.3f} {r['import_pagina_s']:>11.3f} {ren}")
@@ -0,0 +1,117 @@
+# Compara a renderização antiga do Kanban (um st.markdown + quatro botões por cartão, data
+# convertida linha a linha) com a renderização em lote de kanban.py, em 100/1k/10k cartões.
+# Roda sem servidor: o Streamlit em "bare mode" só monta os elementos, sem enviar ao navegador,
+# então o ganho real (menos mensagens para o front-end) é maior do que o medido aqui.
+#
+# uso: python benchmarks/bench_kanban.py [--tamanhos 100 1000 10000] [--repeticoes 3]
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+
+from kanban import html_coluna, rotulos_cartoes  # noqa: E402
+
+logging.disable(logging.WARNING)  # silencia os avisos de ScriptRunContext do bare mode
+
+
+def gerar_pendencias(n, seed=0):
+    rng = np.random.default_rng(seed)
+    hoje = date.today()
+    prazos = [(hoje + timedelta(days=int(d))).isoformat() if d > -40 else None for d in rng.integers(-50, 30, n)]
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'titulo': [f"Tarefa {i}" for i in range(n)],
+        'descricao': [f"Descrição da tarefa {i} com algum texto" for i in range(n)],
+        'responsavel': rng.choice(['MICHEL', 'BRUNO', 'PEDRO', 'JULIO MARIANO'], n),
+        'frota_vinculada': rng.choice(['61008', '58265', None], n),
+        'prioridade': rng.choice(['Alta', 'Média', 'Baixa'], n),
+        'status': rng.choice(['A Fazer', 'Fazendo', 'Feito'], n),
+        'data_criacao': hoje.isoformat(),
+        'data_prazo': prazos,
+    })
+
+
+# --- RENDERIZAÇÃO ANTIGA (cópia do render_card original) ---
+prio_colors = {"Alta": "#ff4b4b", "Média": "#ffa421", "Baixa": "#27ae60"}
+status_bg = {"A Fazer": "#ffffff", "Fazendo": "#d4e6f1", "Feito": "#d5f5e3"}
+
+
+def render_card(row, col_type):
+    border = prio_colors.get(row['prioridade'], "#ccc")
+    bg = status_bg.get(row['status'], "#fff")
+    frota = f"{row['frota_vinculada']}" if row['frota_vinculada'] else "Geral"
+    txt_prazo = ""
+    if row['data_prazo']:
+        try:
+            dp = pd.to_datetime(row['data_prazo']).date();
+            hoje = date.today()
+            if row['status'] == "Feito":
+                txt_prazo = f"<span style='color:#27ae60'>✔ {dp.strftime('%d/%m')}</span>"
+            elif dp < hoje:
+                txt_prazo = f"<span style='color:#c0392b; font-weight:bold'>🔥 {dp.strftime('%d/%m')}</span>"
+            elif dp == hoje:
+                txt_prazo = f"<span style='color:#e67e22; font-weight:bold'>⚠️ Hoje</span>"
+            else:
+                txt_prazo = f"📅 {dp.strftime('%d/%m')}"
+        except:
+            pass
+    html_card = f"""
+<div class="kanban-card prio-{row['prioridade']}" style="background-color: {bg} !important;">
+<div class="k-title">{row['titulo']}</div>
+<div class="k-desc">{row['descricao']}</div>
+<div class="k-meta"><span>🚜 {frota}</span><span>{txt_prazo}</span></div>
+</div>
+"""
+    st.markdown(html_card, unsafe_allow_html=True)
+    b1, b2, b3, b4 = st.columns([1, 1, 1, 1])
+    b1.button("✏️", key=f"e_{row['id']}")
+    b4.button("▶️", key=f"g_{row['id']}")
+
+
+def render_antigo(df):
+    for _, r in df.iterrows(): render_card(r, "todo")
+
+
+# --- RENDERIZAÇÃO EM LOTE ---
+def render_lote(df):
+    rot = rotulos_cartoes(df)
+    st.selectbox("Tarefa", list(rot), format_func=rot.get, key=f"sel_{len(df)}")
+    st.columns(3)[0].button("✏️", key=f"e_lote_{len(df)}")
+    st.markdown(html_coluna(df), unsafe_allow_html=True)
+
+
+def medir(func, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter(); func(df); tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def executar(tamanhos=(100, 1000, 10000), repeticoes=3):
+    resultados = []
+    for n in tamanhos:
+        df = gerar_pendencias(n)
+        t_antigo = medir(render_antigo, df, 1 if n >= 10000 else repeticoes)
+        t_lote = medir(render_lote, df, repeticoes)
+        resultados.append({'cartoes': n, 'antigo_s': round(t_antigo, 4), 'lote_s': round(t_lote, 4),
+                           'ganho': round(t_antigo / t_lote, 1) if t_lote else None})
+    return resultados
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--tamanhos', type=int, nargs='+', default=[100, 1000, 10000])
+    ap.add_argument('--repeticoes', type=int, default=3)
+    a = ap.parse_args()
+    print(f"{'cartões':>8} {'antigo (s)':>11} {'lote (s)':>9} {'ganho':>7}")
+    for r in executar(a.tamanhos, a.repeticoes):
+        print(f"{r['cartoes']:>8} {r['antigo_s']:>11.4f} {r['lote_s']:>9.4f} {r['ganho']:>6}x")
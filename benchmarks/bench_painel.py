@@ -0,0 +1,115 @@
+# Compara o gráfico antigo do Painel TV (um px.bar com facet_row='lote', altura 400 + 50 por
+# máquina, rótulos ajustados anotação por anotação) com os modos de painel.py: Detalhado (uma
+# página de figuras por lote), Resumo (lote x status empilhado) e Mapa de calor. Mede o tempo
+# de montar a figura, o de serializar para JSON (o que o st.plotly_chart envia) e o tamanho
+# desse JSON — o navegador leva tempo proporcional a ele para desenhar.
+#
+# uso: python benchmarks/bench_painel.py [--tamanhos 100 1000 5000] [--por-lote 25] [--limite-legado 2000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from painel import (figura_lote, figura_mapa_calor, figura_resumo, fatia_pagina, paginas_tv,  # noqa: E402
+                    MAQUINAS_POR_PAGINA)
+
+CORES = {"Aguardando": "#95a5a6", "Em Andamento": "#3498db", "Peça Pendente": "#e67e22", "Concluído": "#2ecc71"}
+
+
+def gerar_maquinas(n, por_lote=25, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'lote': [f"LOTE {i // por_lote + 1:03d}" for i in range(n)],
+        'frota': [str(60000 + i) for i in range(n)],
+        'modelo': rng.choice(['JD 8R', 'CASE 8250', 'NH T7'], n),
+        'responsavel': rng.choice(['MICHEL', 'BRUNO', 'PEDRO', 'JULIO MARIANO'], n),
+        'status': rng.choice(list(CORES), n),
+        'progresso': rng.integers(0, 101, n),
+    })
+
+
+def resumo_de(df):
+    # Mesmo formato da tabela resumo_lotes
+    g = df.groupby(['lote', 'status'])['progresso']
+    return pd.DataFrame({'qtd': g.size(), 'qtd_progresso': g.count(), 'soma_progresso': g.sum()}).reset_index()
+
+
+# --- GRÁFICO ANTIGO (cópia do painel original) ---
+def figura_legado(df_v, cores):
+    df_v = df_v.assign(rotulo=df_v['frota'] + " (" + df_v['responsavel'] + ")").sort_values(by=['lote', 'progresso'])
+    fig = px.bar(df_v, y='rotulo', x='progresso', color='status', facet_row='lote', text='progresso',
+                 orientation='h', color_discrete_map=cores, height=400 + (len(df_v) * 50))
+    fig.update_layout(xaxis_range=[0, 120], yaxis_title=None, font=dict(size=18, color="black"),
+                      margin=dict(l=220), legend=dict(orientation="h", y=1.01),
+                      paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    fig.update_traces(texttemplate='%{text}%', textposition='outside', textfont_size=20,
+                      textfont_weight="bold", textfont_color="black")
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1], font=dict(size=22, color="black")))
+    fig.update_yaxes(matches=None, showticklabels=True, tickfont=dict(size=18, color="black"))
+    return [fig]
+
+
+# --- MODOS NOVOS ---
+def figuras_detalhado(df_v, cores):
+    # Só a primeira página, que é o que vai para o navegador
+    paginas = paginas_tv(df_v.groupby('lote').size().to_dict(), MAQUINAS_POR_PAGINA)
+    return [figura_lote(fatia_pagina(df_v[df_v['lote'] == lote], parte), lote, cores)
+            for lote, parte, _ in paginas[0]]
+
+
+MODOS = {
+    'legado': figura_legado,
+    'detalhado': figuras_detalhado,
+    'resumo': lambda df_v, cores: [figura_resumo(resumo_de(df_v), cores)],
+    'mapa_calor': lambda df_v, cores: [figura_mapa_calor(resumo_de(df_v))],
+}
+
+
+def medir(func, df, repeticoes):
+    melhor = None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter(); figs = func(df, CORES); t1 = time.perf_counter()
+        carga = sum(len(f.to_json()) for f in figs); t2 = time.perf_counter()
+        if melhor is None or (t2 - t0) < melhor[0] + melhor[1]:
+            melhor = (t1 - t0, t2 - t1, carga)
+    return melhor
+
+
+def executar(tamanhos=(100, 1000, 5000), por_lote=25, repeticoes=3, limite_legado=2000):
+    resultados = []
+    for n in tamanhos:
+        df = gerar_maquinas(n, por_lote)
+        for modo, func in MODOS.items():
+            if modo == 'legado' and n > limite_legado:
+                continue
+            try:
+                montar, serializar, carga = medir(func, df, 1 if modo == 'legado' else repeticoes)
+            except ValueError as e:
+                # o facet_row antigo não monta com mais de ~33 lotes (espaçamento entre linhas)
+                resultados.append({'maquinas': n, 'modo': modo, 'erro': str(e).splitlines()[0]})
+                continue
+            resultados.append({'maquinas': n, 'modo': modo, 'montar_s': round(montar, 4),
+                               'json_s': round(serializar, 4), 'payload_kb': round(carga / 1024, 1)})
+    return resultados
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--tamanhos', type=int, nargs='+', default=[100, 1000, 5000])
+    ap.add_argument('--por-lote', type=int, default=25)
+    ap.add_argument('--repeticoes', type=int, default=3)
+    ap.add_argument('--limite-legado', type=int, default=2000, help="acima disso o gráfico antigo não é medido")
+    a = ap.parse_args()
+    print(f"{'máquinas':>9} {'modo':>11} {'montar (s)':>11} {'json (s)':>9} {'payload (KB)':>13}")
+    for r in executar(a.tamanhos, a.por_lote, a.repeticoes, a.limite_legado):
+        if 'erro' in r:
+            print(f"{r['maquinas']:>9} {r['modo']:>11}  falhou: {r['erro']}")
+            continue
+        print(f"{r['maquinas']:>9} {r['modo']:>11} {r['montar_s']:>11.4f} {r['json_s']:>9.4f} {r['payload_kb']:>13.1f}")
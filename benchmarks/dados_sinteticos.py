@@ -0,0 +1,103 @@
+# Gera um banco SQLite sintético com o esquema atual (todas as migrações de migracoes.py) e
+# volume configurável: gestores, status_config, reformas em lotes de MAQUINAS_POR_LOTE e
+# pendências ligadas às frotas. As linhas entram pelos INSERTs normais, então os triggers (log
+# de alterações, resumo por lote, índice de busca) trabalham como na aplicação.
+#
+# uso: python benchmarks/dados_sinteticos.py destino.sqlite [--reformas 10000] [--pendencias N] [--seed 0]
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migracoes  # noqa: E402
+
+MAQUINAS_POR_LOTE = 50
+GESTORES = [(n, s) for n, s in zip(
+    ['BRUNO', 'PEDRO', 'CARLOS AGUSTO', 'MICHEL', 'JOÉSIO', 'JULIO MARIANO', 'ANA', 'RAFAEL', 'LUCAS', 'MARCOS',
+     'FERNANDA', 'DIEGO', 'PAULO', 'RENATO', 'SÉRGIO', 'TIAGO', 'VÂNIA', 'WAGNER', 'ÍTALO', 'ZECA'],
+    ['GESTOR'] * 12 + ['Manut'] * 5 + ['Ext'] * 3)]
+STATUS = [("Aguardando", "#95a5a6"), ("Em Andamento", "#3498db"), ("Peça Pendente", "#e67e22"),
+          ("Pintura", "#9b59b6"), ("Concluído", "#2ecc71")]
+PESO_STATUS = [0.25, 0.3, 0.15, 0.1, 0.2]
+MODELOS = ['JD 8R 410', 'CASE 8250', 'NH T7.245', 'VALTRA BH194', 'MF 8737', 'JD 3520']
+PECAS = ['bomba hidráulica', 'embreagem', 'radiador', 'cabine', 'pneus', 'alternador', 'freio', 'injeção',
+         'rolamento', 'cardã', 'mangueira', 'filtro']
+
+
+def _datas(rng, base, n, dias_min, dias_max):
+    return [(base + timedelta(days=int(d))).isoformat() for d in rng.integers(dias_min, dias_max, n)]
+
+
+def gerar_banco(caminho, n_reformas, n_pendencias=None, seed=0):
+    # Cria `caminho` (não pode existir) e devolve {'reformas', 'pendencias', 'segundos'}
+    if os.path.exists(caminho):
+        raise FileExistsError(caminho)
+    n_pendencias = n_reformas if n_pendencias is None else n_pendencias
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    migracoes.migrar(caminho)
+    hoje = date.today()
+    nomes = [g[0] for g in GESTORES]
+
+    status = rng.choice([s for s, _ in STATUS], n_reformas, p=PESO_STATUS)
+    progresso = np.where(status == 'Concluído', 100, np.where(status == 'Aguardando', 0,
+                                                              rng.integers(5, 96, n_reformas)))
+    inicio = _datas(rng, hoje, n_reformas, -180, 0)
+    reformas = zip(
+        [f"LOTE {i // MAQUINAS_POR_LOTE + 1:04d}" for i in range(n_reformas)],
+        [str(100000 + i) for i in range(n_reformas)],
+        rng.choice(MODELOS, n_reformas).tolist(),
+        rng.choice(nomes, n_reformas).tolist(),
+        inicio,
+        [(date.fromisoformat(d) + timedelta(days=int(x))).isoformat()
+         for d, x in zip(inicio, rng.integers(30, 150, n_reformas))],
+        status.tolist(), progresso.tolist(),
+        [f"Revisar {a} e {b}" for a, b in zip(rng.choice(PECAS, n_reformas), rng.choice(PECAS, n_reformas))])
+
+    frotas = np.array([str(100000 + i) for i in range(n_reformas)] or [''])
+    prazos = _datas(rng, hoje, n_pendencias, -40, 40)
+    sem_prazo = rng.random(n_pendencias) < 0.15
+    pendencias = zip(
+        [f"Trocar {p}" for p in rng.choice(PECAS, n_pendencias)],
+        [f"Verificar {a} da frota, pedido {i}" for i, a in enumerate(rng.choice(PECAS, n_pendencias))],
+        rng.choice(nomes, n_pendencias).tolist(),
+        [f if f and r > 0.2 else None for f, r in zip(rng.choice(frotas, n_pendencias), rng.random(n_pendencias))],
+        rng.choice(['Alta', 'Média', 'Baixa'], n_pendencias, p=[0.2, 0.5, 0.3]).tolist(),
+        rng.choice(['A Fazer', 'Fazendo', 'Feito'], n_pendencias, p=[0.3, 0.2, 0.5]).tolist(),
+        _datas(rng, hoje, n_pendencias, -120, 0),
+        [None if s else p for p, s in zip(prazos, sem_prazo)])
+
+    conn = sqlite3.connect(caminho, isolation_level=None)
+    try:
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("BEGIN")
+        conn.execute("DELETE FROM gestores")
+        conn.execute("DELETE FROM status_config")
+        conn.executemany("INSERT INTO gestores (nome, setor) VALUES (?, ?)", GESTORES)
+        conn.executemany("INSERT INTO status_config (nome, cor) VALUES (?, ?)", STATUS)
+        conn.executemany("INSERT INTO reformas (lote, frota, modelo, responsavel, data_inicio, data_previsao, status, "
+                         "progresso, observacao) VALUES (?,?,?,?,?,?,?,?,?)", reformas)
+        conn.executemany("INSERT INTO pendencias (titulo, descricao, responsavel, frota_vinculada, prioridade, status, "
+                         "data_criacao, data_prazo) VALUES (?,?,?,?,?,?,?,?)", pendencias)
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+    return {'reformas': n_reformas, 'pendencias': n_pendencias, 'segundos': time.perf_counter() - t0}
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description="Gera um banco sintético para testes de carga.")
+    ap.add_argument('destino')
+    ap.add_argument('--reformas', type=int, default=10000)
+    ap.add_argument('--pendencias', type=int, default=None, help="padrão: o mesmo número de reformas")
+    ap.add_argument('--seed', type=int, default=0)
+    a = ap.parse_args()
+    r = gerar_banco(a.destino, a.reformas, a.pendencias, a.seed)
+    print(f"{r['reformas']} reformas e {r['pendencias']} pendências em {r['segundos']:.1f}s -> {a.destino}")
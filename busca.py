@@ -0,0 +1,40 @@
+import re
+
+import pandas as pd
+
+from db import conexao
+from instrumentacao import medir
+
+# --- BUSCA TEXTUAL (FTS5) ---
+# Consulta o índice busca_fts (mantido por triggers criados em migracoes.py: _criar_busca, com o de
+# UPDATE trocado na migração 9). Cada palavra digitada vira um prefixo ("61*", "rod*"), todas
+# precisam aparecer; o resultado vem ordenado por bm25 com peso maior para frota e título.
+PESOS = (10.0, 3.0, 1.0, 5.0, 1.0)  # frota, modelo, observacao, titulo, descricao
+ORIGENS = {'reformas': 0, 'pendencias': 1}
+
+
+def consulta_fts(texto):
+    termos = re.findall(r'\w+', str(texto or ''))
+    return ' '.join(f'"{t}"*' for t in termos)
+
+
+@medir('busca')
+def buscar(texto, origem=None, limite=200):
+    # DataFrame (origem, id, rank, frota, modelo, observacao, titulo, descricao); origem filtra
+    # só 'reformas' ou só 'pendencias'
+    q = consulta_fts(texto)
+    if not q:
+        return pd.DataFrame(columns=['origem', 'id', 'rank', 'frota', 'modelo', 'observacao', 'titulo', 'descricao'])
+    filtro = f" AND rowid % 2 = {ORIGENS[origem]}" if origem else ""
+    with conexao() as conn:
+        df = pd.read_sql(f"""SELECT rowid, bm25(busca_fts, {', '.join(map(str, PESOS))}) AS rank,
+                                    frota, modelo, observacao, titulo, descricao
+                             FROM busca_fts WHERE busca_fts MATCH ?{filtro} ORDER BY rank LIMIT ?""",
+                         conn, params=(q, limite))
+    df.insert(0, 'origem', (df['rowid'] % 2).map({0: 'reformas', 1: 'pendencias'}))
+    df.insert(1, 'id', df.pop('rowid') // 2)
+    return df
+
+
+def ids_encontrados(texto, origem, limite=5000):
+    return tuple(buscar(texto, origem, limite)['id'].tolist())
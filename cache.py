@@ -0,0 +1,111 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
+
+import db
+import instrumentacao as instr
+
+# --- CACHE DE CONSULTAS POR VERSÃO ---
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_ITENS = 512
+
+
+def _tamanho(valor):
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return int(valor.memory_usage(deep=True).sum()) if isinstance(valor, pd.DataFrame) \
+            else int(valor.memory_usage(deep=True))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(sys.getsizeof(v) for v in valor)
+    if hasattr(valor, 'to_plotly_json'):
+        # figura plotly: getsizeof daria umas dezenas de bytes para qualquer tamanho; o JSON é o que
+        # ela carrega de fato (sem importar plotly aqui)
+        return len(valor.to_json())
+    return sys.getsizeof(valor)
+
+
+class CacheVersionado:
+    # LRU limitado em bytes. Cada chave guarda só o valor da versão mais recente das
+    # tabelas de origem: quando a versão muda a entrada é recalculada e substituída.
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_itens=CACHE_MAX_ITENS):
+        self.max_bytes = max_bytes
+        self.max_itens = max_itens
+        self._itens = OrderedDict()  # chave -> (versao, valor, tamanho)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.descartes = 0
+
+    def obter(self, chave, versao, gerar):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and item[0] == versao:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+        valor = gerar()
+        self._guardar(chave, versao, valor)
+        return valor
+
+    def _guardar(self, chave, versao, valor):
+        tam = _tamanho(valor)
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._bytes -= antigo[2]
+            if tam > self.max_bytes:
+                return
+            self._itens[chave] = (versao, valor, tam)
+            self._bytes += tam
+            while self._bytes > self.max_bytes or len(self._itens) > self.max_itens:
+                _, (_, _, t) = self._itens.popitem(last=False)
+                self._bytes -= t
+                self.descartes += 1
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "descartes": self.descartes,
+                    "taxa_acerto": round(self.hits / total, 3) if total else 0.0,
+                    "itens": len(self._itens), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+_cache = CacheVersionado()
+
+
+def estatisticas(): return _cache.estatisticas()
+
+
+def limpar(): _cache.limpar()
+
+
+def cache_por_versao(*tabelas):
+    # Os valores devolvidos são compartilhados entre sessões: quem chamar não deve alterá-los in-place.
+    # Com instrumentação, cada chamada vira uma medida 'carga' ("nome (cache)" quando não consultou o banco)
+    def decorador(func):
+        nome = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def envolvida(*args, **kwargs):
+            chave = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+            c = instr.coleta_atual()
+            if c is None:
+                return _cache.obter(chave, db.versoes(*tabelas), lambda: func(*args, **kwargs))
+            t0, gerou = time.perf_counter(), []
+            valor = _cache.obter(chave, db.versoes(*tabelas), lambda: gerou.append(1) or func(*args, **kwargs))
+            c.medir('carga', nome if gerou else f"{nome} (cache)", time.perf_counter() - t0, instr.contar_linhas(valor))
+            return valor
+
+        return envolvida
+
+    return decorador
@@ -0,0 +1,94 @@
+import json
+import time
+from datetime import date
+
+import pandas as pd
+
+from db import transacao
+
+# --- CADASTRO DE LOTE EM MASSA ---
+# Validação e deduplicação em conjunto (uma consulta para todas as frotas via json_each) e
+# gravação com um único executemany dentro de uma transação explícita.
+COLUNAS_GRADE = {'frota': 'Frota', 'modelo': 'Modelo', 'obs': 'Obs', 'observacao': 'Obs', 'observação': 'Obs'}
+
+
+def ler_planilha(arquivo, nome=None):
+    # CSV (separador detectado) ou XLSX, tudo como texto para não virar 61008.0. Já volta com as
+    # colunas da grade (Frota, Modelo, Obs), pronta para juntar com a grade do formulário
+    nome = (nome or getattr(arquivo, 'name', '')).lower()
+    if nome.endswith(('.xlsx', '.xls')):
+        return normalizar_grade(pd.read_excel(arquivo, dtype=str))
+    return normalizar_grade(pd.read_csv(arquivo, dtype=str, sep=None, engine='python'))
+
+
+def normalizar_grade(df):
+    df = df.rename(columns={c: COLUNAS_GRADE.get(str(c).strip().lower(), c) for c in df.columns})
+    for c in ('Frota', 'Modelo', 'Obs'):
+        df[c] = df[c].fillna('').astype(str).str.strip() if c in df.columns else ''
+    df = df[df['Frota'] != '']
+    return df[['Frota', 'Modelo', 'Obs']]
+
+
+def inserir_lote(lote, responsavel, previsao, grade):
+    # Devolve o resumo da importação: inseridas, repetidas na planilha, já no lote, frotas que
+    # também existem em outros lotes (inseridas assim mesmo) e a vazão em linhas/s
+    t0 = time.perf_counter()
+    grade = normalizar_grade(grade)
+    unicas = grade.drop_duplicates('Frota')
+    with transacao() as cn:
+        existentes = cn.execute("SELECT frota, lote FROM reformas WHERE frota IN (SELECT value FROM json_each(?))",
+                                (json.dumps(unicas['Frota'].tolist()),)).fetchall()
+        no_lote = {f for f, l in existentes if l == lote}
+        novas = unicas[~unicas['Frota'].isin(no_lote)]
+        hoje = date.today().isoformat()
+        cn.executemany(
+            "INSERT INTO reformas (lote, frota, modelo, responsavel, data_inicio, data_previsao, status, progresso, observacao) VALUES (?,?,?,?,?,?,'Aguardando',0,?)",
+            [(lote, f, m, responsavel, hoje, previsao.isoformat() if previsao else None, o)
+             for f, m, o in novas.itertuples(index=False)])
+    seg = time.perf_counter() - t0
+    return {"inseridas": len(novas), "repetidas_planilha": len(grade) - len(unicas), "ja_no_lote": sorted(no_lote),
+            "em_outros_lotes": sorted({f for f, l in existentes if l != lote}), "segundos": seg,
+            "linhas_por_s": len(novas) / seg if seg else 0.0}
+
+
+def remover_frotas(lote, frotas):
+    with transacao() as cn:
+        return cn.execute("DELETE FROM reformas WHERE lote=? AND frota IN (SELECT value FROM json_each(?))",
+                          (lote, json.dumps([str(f) for f in frotas]))).rowcount
+
+
+# --- GESTORES: SALVAR SÓ O QUE MUDOU ---
+def _nulos(df):
+    return df.astype(object).where(df.notna(), None)
+
+
+def diff_tabela(original, editado, colunas, chave='id'):
+    # Compara o frame editado com o snapshot carregado e devolve (novas, alteradas, ids removidos).
+    # Linhas novas sem o primeiro campo preenchido são ignoradas, como no cadastro antigo.
+    novas = editado[editado[chave].isna()]
+    novas = _nulos(novas[novas[colunas[0]].notna() & (novas[colunas[0]].astype(str) != '')][list(colunas)])
+    mantidas = editado[editado[chave].notna()].astype({chave: int}).set_index(chave)[list(colunas)]
+    orig = original.set_index(chave)[list(colunas)]
+    removidos = orig.index.difference(mantidas.index).tolist()
+    comuns = _nulos(mantidas.loc[mantidas.index.intersection(orig.index)])
+    antes = _nulos(orig.loc[comuns.index])
+    # None != None é True no pandas: nulo dos dois lados conta como igual
+    alteradas = comuns[~((comuns == antes) | (comuns.isna() & antes.isna())).all(axis=1)]
+    return novas, alteradas, removidos
+
+
+def salvar_gestores(original, editado):
+    # Aplica o diff numa transação (executemany por tipo de operação) e devolve as linhas afetadas;
+    # sem alterações não abre transação nenhuma
+    novas, alteradas, removidos = diff_tabela(original, editado, ('nome', 'setor'))
+    if novas.empty and alteradas.empty and not removidos:
+        return {"inseridas": 0, "alteradas": 0, "removidas": 0}
+    with transacao() as cn:
+        if removidos:
+            cn.executemany("DELETE FROM gestores WHERE id=?", [(int(i),) for i in removidos])
+        if not alteradas.empty:
+            cn.executemany("UPDATE gestores SET nome=?, setor=? WHERE id=?",
+                           [(n, s, int(i)) for i, n, s in alteradas.itertuples()])
+        if not novas.empty:
+            cn.executemany("INSERT INTO gestores (nome, setor) VALUES (?,?)", list(novas.itertuples(index=False)))
+    return {"inseridas": len(novas), "alteradas": len(alteradas), "removidas": len(removidos)}
@@ -0,0 +1,97 @@
+import json
+
+import pandas as pd
+
+from cache import cache_por_versao
+from db import conexao, ler_sql
+from prazos import dia_iso, select_pendencias
+
+
+# --- CARREGADORES (CACHE POR VERSÃO DA TABELA) ---
+@cache_por_versao('reformas')
+def carregar_dados(): return ler_sql('SELECT * FROM reformas')
+
+
+@cache_por_versao('gestores')
+def carregar_gestores(): return ler_sql('SELECT * FROM gestores')
+
+
+@cache_por_versao('pendencias')
+def carregar_pendencias(): return ler_sql('SELECT * FROM pendencias')
+
+
+@cache_por_versao('status_config')
+def carregar_cores_status(): df = ler_sql('SELECT * FROM status_config'); return pd.Series(
+    df.cor.values, index=df.nome).to_dict()
+
+
+@cache_por_versao('reformas')
+def carregar_lotes(): return ler_sql("SELECT DISTINCT lote FROM reformas")['lote'].tolist()
+
+
+# --- DIÁRIO DE BORDO: SELETOR POR ID ---
+@cache_por_versao('reformas')
+def indice_rotulos_reformas(lote=None):
+    # id -> "frota - modelo | status", montado no SQL e guardado até a próxima escrita em reformas
+    where, params = ("WHERE lote=?", (lote,)) if lote is not None else ("", ())
+    with conexao() as conn:
+        return dict(conn.execute(f"""SELECT id, ifnull(frota, '') || ' - ' || ifnull(modelo, '') || ' | ' ||
+                                            ifnull(status, '') FROM reformas {where} ORDER BY id""", params))
+
+
+@cache_por_versao('reformas')
+def carregar_reforma(id_r):
+    df = ler_sql("SELECT * FROM reformas WHERE id=?", (int(id_r),))
+    return df.iloc[0] if not df.empty else None
+
+
+# --- KANBAN: FILTROS NO SQL E PAGINAÇÃO POR CHAVE ---
+FEITOS_POR_PAGINA = 15
+
+
+def _filtro_pendencias(responsaveis, prioridades, ids=None):
+    where, params = [], []
+    if ids is not None:
+        where.append("id IN (SELECT value FROM json_each(?))"); params.append(json.dumps(list(ids)))
+    if responsaveis:
+        where.append(f"responsavel IN ({','.join('?' * len(responsaveis))})"); params += list(responsaveis)
+    if prioridades:
+        where.append(f"prioridade IN ({','.join('?' * len(prioridades))})"); params += list(prioridades)
+    return ''.join(f" AND {w}" for w in where), params
+
+
+@cache_por_versao('pendencias')
+def carregar_pendencias_status(status, responsaveis=(), prioridades=(), ids=None, hoje=None):
+    # responsaveis/prioridades como tupla (chave do cache); vazio = sem filtro. ids: resultado da busca.
+    # Traz classe_prazo/prazo_br calculados no SQL para `hoje` (passar a data: ela faz parte da chave)
+    filtro, params = _filtro_pendencias(responsaveis, prioridades, ids)
+    return ler_sql(select_pendencias(f"WHERE status=?{filtro} ORDER BY id"), [dia_iso(hoje), status] + params)
+
+
+@cache_por_versao('pendencias')
+def carregar_pagina_feitos(responsaveis=(), prioridades=(), antes_de=None, limite=FEITOS_POR_PAGINA, ids=None,
+                           hoje=None):
+    # Keyset: a próxima página começa no id anterior ao último exibido, sem OFFSET
+    filtro, params = _filtro_pendencias(responsaveis, prioridades, ids)
+    if antes_de is not None:
+        filtro += " AND id<?"; params.append(int(antes_de))
+    return ler_sql(select_pendencias(f"WHERE status='Feito'{filtro} ORDER BY id DESC LIMIT ?"),
+                   [dia_iso(hoje)] + params + [limite])
+
+
+# --- PAINEL: KPIs A PARTIR DO RESUMO MATERIALIZADO ---
+@cache_por_versao('reformas')
+def carregar_resumo_lotes():
+    df = ler_sql("SELECT * FROM resumo_lotes ORDER BY lote, status")
+    df['lote'] = df['lote'].mask(df['lote'] == '', None)
+    return df
+
+
+def kpis_lotes(resumo, lotes):
+    # Mesmos números do cálculo antigo sobre todas as máquinas (média ignora progresso nulo)
+    r = resumo[resumo['lote'].isin(lotes)]
+    qtd_prog = r['qtd_progresso'].sum()
+    return {"total": int(r['qtd'].sum()),
+            "prontas": int(r.loc[r['status'] == 'Concluído', 'qtd'].sum()),
+            "pendentes": int(r.loc[r['status'] == 'Peça Pendente', 'qtd'].sum()),
+            "andamento": r['soma_progresso'].sum() / qtd_prog if qtd_prog else float('nan')}
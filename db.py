@@ -0,0 +1,336 @@
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import queue
+from contextlib import contextmanager
+from datetime import date
+
+import pandas as pd
+
+import instrumentacao as instr
+
+# --- CONFIGURAÇÃO DO BANCO ---
+# Lida do ambiente, para vários processos do Streamlit (atrás de um proxy) usarem o mesmo arquivo
+DB_PATH = os.environ.get('REFORMA_DB') or 'reforma_db_final.sqlite'
+POOL_TAMANHO = int(os.environ.get('REFORMA_POOL_TAMANHO', 8))  # conexões de leitura mantidas pelo processo
+BUSY_TIMEOUT_MS = int(os.environ.get('REFORMA_BUSY_TIMEOUT_MS', 5000))  # espera pelo lock antes de "database is locked"
+ESCRITA_TENTATIVAS = int(os.environ.get('REFORMA_ESCRITA_TENTATIVAS', 5))  # BEGIN IMMEDIATE com o banco ocupado
+ESCRITA_ESPERA_S = 0.05  # espera antes da 2ª tentativa; dobra a cada uma, com variação aleatória
+VERIFICAR_EXTERNAS_S = float(os.environ.get('REFORMA_VERIFICAR_S', 1.0))  # intervalo do PRAGMA data_version
+CACHE_STATEMENTS = 256  # statements preparados reaproveitados por conexão
+
+# date -> 'AAAA-MM-DD' explícito (o adaptador padrão do sqlite3 está obsoleto desde o Python 3.12);
+# é o formato que os triggers de data aceitam, ver migracoes._datas_iso
+sqlite3.register_adapter(date, date.isoformat)
+
+
+# --- CONEXÃO E CURSOR MEDIDOS ---
+# Com uma coleta aberta (instrumentacao.py) cada execute/executemany vira uma medida 'sql' com o
+# texto normalizado; fetchall/fetchmany somam o tempo e as linhas lidas na mesma medida. Sem
+# coleta o custo é um getattr a mais por comando.
+class CursorMedido(sqlite3.Cursor):
+    _medida = None
+
+    def _medir(self, executar, sql, params):
+        c = instr.coleta_atual()
+        if c is None:
+            self._medida = None
+            return executar(sql, params)
+        t0 = time.perf_counter()
+        try:
+            return executar(sql, params)
+        finally:
+            self._medida = c.medir('sql', instr.normalizar_sql(sql), time.perf_counter() - t0, max(self.rowcount, 0))
+
+    def execute(self, sql, params=()): return self._medir(super().execute, sql, params)
+
+    def executemany(self, sql, seq_params): return self._medir(super().executemany, sql, seq_params)
+
+    def _ler(self, ler, *args):
+        m = self._medida
+        if m is None:
+            return ler(*args)
+        t0 = time.perf_counter()
+        linhas = ler(*args)
+        m[2] += time.perf_counter() - t0; m[3] += len(linhas)
+        return linhas
+
+    def fetchall(self): return self._ler(super().fetchall)
+
+    def fetchmany(self, size=None): return self._ler(super().fetchmany, size or self.arraysize)
+
+
+class ConexaoMedida(sqlite3.Connection):
+    def cursor(self, factory=CursorMedido): return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        if instr.coleta_atual() is None: return super().execute(sql, params)
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_params):
+        if instr.coleta_atual() is None: return super().executemany(sql, seq_params)
+        return self.cursor().executemany(sql, seq_params)
+
+
+def _abrir_conexao(caminho):
+    # isolation_level=None: autocommit, as transações são abertas explicitamente em transacao()
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(caminho, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                           isolation_level=None, cached_statements=CACHE_STATEMENTS, factory=ConexaoMedida)
+    conn.execute("PRAGMA journal_mode=WAL")  # leitores não bloqueiam atrás do escritor
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")  # responsavel -> gestores(nome), ver migracoes.py
+    instr.registrar('conexao', 'abrir', time.perf_counter() - t0)
+    return conn
+
+
+# --- VERSÕES DAS TABELAS ---
+# Contador por tabela incrementado a cada commit que escreve nela; o cache de consultas
+# usa essas versões como chave, então uma tabela sem escrita é servida da memória.
+_RE_ESCRITA = re.compile(r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)'
+                         r'\s+["\[`]?(\w+)', re.IGNORECASE)
+# Escritas que o SQLite propaga sozinho (ON UPDATE CASCADE / ON DELETE SET NULL) não passam
+# pelo trace, então a tabela pai também invalida as filhas.
+DEPENDENCIAS = {'gestores': ('reformas', 'pendencias')}
+_versoes = {}
+_versoes_lock = threading.Lock()
+_proxima_verificacao = 0.0
+
+
+def versoes(*tabelas):
+    global _proxima_verificacao
+    if time.monotonic() >= _proxima_verificacao:
+        _proxima_verificacao = time.monotonic() + VERIFICAR_EXTERNAS_S
+        get_pool().verificar_externas()
+    return tuple(_versoes.get(t, 0) for t in tabelas)
+
+
+def seqs_log(conn):
+    # tabela -> max(seq) do log_alteracoes: a versão da tabela no arquivo, a mesma em todos os
+    # processos. Pula de tabela em tabela pelo índice (tabela, seq) em vez de varrer o log
+    return dict(conn.execute("""WITH RECURSIVE t (tabela) AS (
+                                     SELECT min(tabela) FROM log_alteracoes
+                                     UNION ALL SELECT (SELECT min(tabela) FROM log_alteracoes WHERE tabela > t.tabela)
+                                     FROM t WHERE t.tabela IS NOT NULL)
+                                 SELECT tabela, (SELECT max(seq) FROM log_alteracoes l WHERE l.tabela = t.tabela)
+                                 FROM t WHERE tabela IS NOT NULL""").fetchall())
+
+
+def _incrementar(tabelas):
+    with _versoes_lock:
+        for t in tabelas:
+            _versoes[t] = _versoes.get(t, 0) + 1
+
+
+def marcar_alteradas(*tabelas):
+    _incrementar(set(tabelas).union(*(DEPENDENCIAS.get(t, ()) for t in tabelas)))
+
+
+def _ocupado(erro):
+    # SQLITE_BUSY / SQLITE_LOCKED: outro processo segura o lock de escrita
+    return getattr(erro, 'sqlite_errorcode', None) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED) \
+        or 'locked' in str(erro) or 'busy' in str(erro)
+
+
+def _begin_immediate(conn):
+    # O busy_timeout já espera dentro do SQLite; esgotado, a transação é tentada de novo com espera crescente
+    for tentativa in range(ESCRITA_TENTATIVAS):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as e:
+            if not _ocupado(e) or tentativa == ESCRITA_TENTATIVAS - 1:
+                raise
+        espera = ESCRITA_ESPERA_S * 2 ** tentativa * (0.5 + random.random())
+        instr.registrar('escrita', 'banco ocupado (nova tentativa)', espera)
+        time.sleep(espera)
+
+
+# --- POOL DE CONEXÕES ---
+class PoolConexoes:
+    # Pool do processo inteiro: as conexões sobrevivem aos reruns do Streamlit e são
+    # compartilhadas entre sessões, então o custo de abrir/configurar é pago uma vez.
+    # Leituras usam as conexões do pool; escritas passam uma por vez pela conexão de escrita
+    # (fila de escrita), então entre threads a espera é no lock e o SQLite só arbitra entre processos.
+    def __init__(self, caminho=None, tamanho=POOL_TAMANHO):
+        self.caminho = caminho or DB_PATH
+        self.tamanho = tamanho
+        self._livres = queue.LifoQueue()
+        self._abertas = 0
+        self._todas = []  # toda conexão de leitura aberta, livre ou em uso, para o fechar()
+        self._lock = threading.Lock()
+        self._fila_escrita = threading.Lock()
+        self._escrita = None
+        self._data_version = None
+        self._seqs = {}  # tabela -> max(seq) do log_alteracoes na última verificação
+
+    def _obter(self):
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._abertas < self.tamanho:
+                self._abertas += 1
+                try:
+                    conn = _abrir_conexao(self.caminho)
+                except Exception:
+                    self._abertas -= 1
+                    raise
+                self._todas.append(conn)
+                return conn
+        return self._livres.get()
+
+    def _devolver(self, conn):
+        if conn not in self._todas:
+            return  # fechada pelo fechar() enquanto estava em uso
+        if conn.in_transaction:
+            conn.rollback()
+        self._livres.put(conn)
+
+    @contextmanager
+    def conexao(self):
+        t0 = time.perf_counter()
+        conn = self._obter()
+        instr.registrar('conexao', 'obter do pool', time.perf_counter() - t0)
+        try:
+            yield conn
+        finally:
+            self._devolver(conn)
+
+    def _conexao_escrita(self):
+        # Só com a fila de escrita na mão
+        if self._escrita is None:
+            self._escrita = _abrir_conexao(self.caminho)
+            self._verificar_externas(self._escrita)
+        return self._escrita
+
+    # --- ALTERAÇÕES DE OUTROS PROCESSOS ---
+    # PRAGMA data_version da conexão de escrita só muda quando outra conexão grava no arquivo: como
+    # todas as escritas do processo passam por ela, mudança = outro processo (ou o migrar). Invalida
+    # só as tabelas do log_alteracoes cujo max(seq) andou; as sem log (trabalhos, busca, histórico...)
+    # só quando nenhuma do log andou, senão cada tique de progresso de um trabalho noutro processo
+    # derrubaria o cache de todo mundo.
+    def verificar_externas(self):
+        if not self._fila_escrita.acquire(blocking=False):
+            return  # escrita em andamento: fica para a próxima verificação
+        try:
+            self._verificar_externas(self._conexao_escrita())
+        finally:
+            self._fila_escrita.release()
+
+    def _verificar_externas(self, conn):
+        dv = conn.execute("PRAGMA data_version").fetchone()[0]
+        if dv == self._data_version:
+            return
+        primeira, self._data_version = self._data_version is None, dv
+        # tabelas com log: as que têm os triggers de migracoes (trg_<tabela>_log_i), mesmo sem linha no log ainda
+        com_log = {t for (t,) in conn.execute("SELECT tbl_name FROM sqlite_master WHERE type='trigger' "
+                                              "AND name GLOB 'trg_*_log_i'")}
+        seqs = seqs_log(conn) if com_log else {}
+        if not primeira:
+            # sem DEPENDENCIAS: cascatas de outro processo já aparecem no log das tabelas filhas
+            alteradas = [t for t in set(seqs) | set(self._seqs) if seqs.get(t) != self._seqs.get(t)]
+            if not alteradas:
+                alteradas = [t for (t,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                             if t not in com_log]
+            _incrementar(alteradas)
+            instr.registrar('conexao', 'alteração de outro processo', 0.0)
+        self._seqs = seqs
+
+    @contextmanager
+    def transacao(self):
+        # BEGIN IMMEDIATE pega o lock de escrita logo no início e evita deadlock de upgrade
+        t0 = time.perf_counter()
+        with self._fila_escrita:
+            conn = self._conexao_escrita()
+            instr.registrar('escrita', 'fila de escrita', time.perf_counter() - t0)
+            alteradas = set()
+
+            def _rastrear(sql):
+                m = _RE_ESCRITA.match(sql)
+                if m: alteradas.add(m.group(1).lower())
+
+            conn.set_trace_callback(_rastrear)
+            try:
+                _begin_immediate(conn)
+                try:
+                    yield conn
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+            finally:
+                conn.set_trace_callback(None)
+                instr.registrar('escrita', ', '.join(sorted(alteradas)) or '(sem escrita)', time.perf_counter() - t0)
+            marcar_alteradas(*alteradas)
+
+    def fechar(self):
+        # Fecha também as conexões em uso: quem ainda estiver lendo recebe ProgrammingError em vez de
+        # continuar, sem saber, no arquivo anterior
+        with self._lock:
+            for conn in self._todas:
+                conn.close()
+            self._todas, self._abertas = [], 0
+            while True:
+                try:
+                    self._livres.get_nowait()
+                except queue.Empty:
+                    break
+        with self._fila_escrita:
+            if self._escrita is not None:
+                self._escrita.close()
+                self._escrita = None
+            self._data_version = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolConexoes()
+    return _pool
+
+
+def trocar_banco(caminho):
+    # Aponta o pool do processo para outro arquivo (benchmarks, bancos sintéticos). Todas as conexões
+    # do pool anterior são fechadas, inclusive as em uso: não chamar com leituras em andamento em
+    # outras threads. Quem chama limpa o cache de consultas (cache.limpar()).
+    global _pool, DB_PATH, _proxima_verificacao
+    with _pool_lock:
+        if _pool is not None:
+            _pool.fechar()
+        DB_PATH = caminho
+        _pool = PoolConexoes(caminho)
+        _proxima_verificacao = 0.0
+
+
+# --- ATALHOS ---
+def conexao(): return get_pool().conexao()
+
+
+def transacao(): return get_pool().transacao()
+
+
+def ler_sql(sql, params=()):
+    with conexao() as conn:
+        return pd.read_sql(sql, conn, params=params)
+
+
+def executar(sql, params=()):
+    with transacao() as conn:
+        return conn.execute(sql, params).rowcount
+
+
+def executar_muitos(sql, seq_params):
+    with transacao() as conn:
+        return conn.executemany(sql, seq_params).rowcount
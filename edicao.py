@@ -0,0 +1,93 @@
+import json
+from datetime import date
+
+import pandas as pd
+
+from db import transacao
+
+# --- EDIÇÃO CONCORRENTE (CONTROLE OTIMISTA) ---
+# As telas gravam só os campos que o usuário mudou, com a versao vista ao abrir a tela na cláusula
+# WHERE (a coluna versao é carimbada pelos triggers de migracoes._criar_rastreamento a cada escrita).
+# Se outra pessoa gravou a linha nesse meio tempo a escrita ainda vale quando os campos a gravar
+# continuam com o valor visto (mesclagem campo a campo); senão nada é gravado e sobe Conflito.
+
+
+class Conflito(Exception):
+    def __init__(self, tabela, id_linha, atual, campos, meus):
+        # atual: a linha como está no banco (None se foi excluída); campos: campo -> (visto, meu, atual)
+        # dos que conflitam; meus: todos os campos que o usuário mudou, para gravar depois de resolver
+        super().__init__(f"{tabela} {id_linha}: alterado por outra pessoa ({', '.join(campos) or 'excluído'})")
+        self.tabela, self.id_linha, self.atual, self.campos, self.meus = tabela, id_linha, atual, campos, meus
+
+    def quadro(self):
+        # Tudo como texto: colunas com tipos misturados não passam para o st.dataframe
+        txt = lambda v: '' if v is None else str(v)
+        return pd.DataFrame([(c, txt(v), txt(m), txt(a)) for c, (v, m, a) in self.campos.items()],
+                            columns=['campo', 'visto ao abrir', 'seu valor', 'valor atual'])
+
+
+def valor_sql(v):
+    # O valor como fica no banco: datas em ISO, NaN/NaT -> None, escalares numpy -> Python
+    if v is None or v is pd.NaT or (isinstance(v, float) and v != v):
+        return None
+    if isinstance(v, pd.Timestamp):
+        v = v.date()
+    if isinstance(v, date):
+        return v.isoformat()
+    return v.item() if hasattr(v, 'item') else v
+
+
+def _linha(cn, tabela, id_linha):
+    cur = cn.execute(f"SELECT * FROM {tabela} WHERE id=?", (int(id_linha),))
+    r = cur.fetchone()
+    return dict(zip([d[0] for d in cur.description], r)) if r else None
+
+
+def _gravar(cn, tabela, id_linha, campos, visto):
+    # versao igual à vista, ou os campos a gravar ainda com o valor visto (outra pessoa mexeu em outros campos)
+    return cn.execute(f"UPDATE {tabela} SET {', '.join(f'{c}=?' for c in campos)} "
+                      f"WHERE id=? AND (versao=? OR ({' AND '.join(f'{c} IS ?' for c in campos)}))",
+                      [*campos.values(), int(id_linha), int(visto['versao']),
+                       *(valor_sql(visto[c]) for c in campos)]).rowcount
+
+
+def atualizar_campos(tabela, id_linha, visto, novos):
+    # visto: a linha como estava ao abrir a tela (com versao); novos: campo -> valor do formulário.
+    # Devolve os campos gravados ({} sem alteração, sem abrir transação). Para "manter os meus" depois
+    # de um conflito: atualizar_campos(tabela, id, erro.atual, erro.meus)
+    alterados = {c: valor_sql(v) for c, v in novos.items() if valor_sql(v) != valor_sql(visto[c])}
+    if not alterados:
+        return {}
+    with transacao() as cn:
+        if _gravar(cn, tabela, id_linha, alterados, visto):
+            return alterados
+        atual = _linha(cn, tabela, id_linha)
+        if atual is None:
+            raise Conflito(tabela, id_linha, None, {}, alterados)
+        conflitos = {c: (valor_sql(visto[c]), v, atual[c]) for c, v in alterados.items()
+                     if atual[c] != valor_sql(visto[c]) and atual[c] != v}
+        if conflitos:
+            raise Conflito(tabela, id_linha, atual, conflitos, alterados)
+        # sem conflito de fato (a outra pessoa gravou o mesmo valor): grava o que ainda difere;
+        # dentro do BEGIN IMMEDIATE a versao recém-lida não muda
+        pendentes = {c: v for c, v in alterados.items() if atual[c] != v}
+        if pendentes:
+            _gravar(cn, tabela, id_linha, pendentes, atual)
+    return pendentes
+
+
+def atualizar_em_massa(tabela, campo, valor, vistos):
+    # vistos: id -> (versao, valor do campo) como estavam na tela. Grava `campo` só nas linhas ainda
+    # como vistas (mesma versao ou mesmo valor no campo) e que já não têm `valor`, num executemany.
+    # Devolve (linhas gravadas, ids que outra pessoa alterou e ficaram sem gravar)
+    valor = valor_sql(valor)
+    if not vistos:
+        return 0, []
+    with transacao() as cn:
+        gravadas = cn.executemany(f"UPDATE {tabela} SET {campo}=? WHERE id=? AND {campo} IS NOT ? "
+                                  f"AND (versao=? OR {campo} IS ?)",
+                                  [(valor, int(i), valor, int(v), valor_sql(c)) for i, (v, c) in vistos.items()]).rowcount
+        conflito = [i for (i,) in cn.execute(f"SELECT id FROM {tabela} WHERE id IN (SELECT value FROM json_each(?)) "
+                                             f"AND {campo} IS NOT ? ORDER BY id",
+                                             (json.dumps([int(i) for i in vistos]), valor))]
+    return gravadas, conflito
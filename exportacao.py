@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+import xlsxwriter
+
+from db import conexao
+from instrumentacao import medir
+
+# --- EXPORTAÇÃO EXCEL EM STREAMING ---
+# As linhas saem do cursor do SQLite em blocos e vão direto para o xlsxwriter em modo
+# constant_memory (cada linha é gravada no arquivo temporário assim que a próxima começa),
+# então nenhuma tabela é montada inteira em memória.
+TAMANHO_BLOCO = 1000
+COLUNAS_INTERNAS = {'versao'}
+
+
+def _colunas(conn, tabela):
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({tabela})") if r[1] not in COLUNAS_INTERNAS]
+
+
+def _consultas(data_inicio=None, data_fim=None, lotes=None):
+    # (aba, tabela, where, params) — período sobre data_inicio/data_criacao, lote direto ou via frota
+    filtros = {'reformas': ([], []), 'pendencias': ([], [])}
+    if data_inicio:
+        filtros['reformas'][0].append("data_inicio >= ?"); filtros['reformas'][1].append(str(data_inicio))
+        filtros['pendencias'][0].append("data_criacao >= ?"); filtros['pendencias'][1].append(str(data_inicio))
+    if data_fim:
+        filtros['reformas'][0].append("data_inicio <= ?"); filtros['reformas'][1].append(str(data_fim))
+        filtros['pendencias'][0].append("data_criacao <= ?"); filtros['pendencias'][1].append(str(data_fim))
+    if lotes:
+        pl = ','.join('?' * len(lotes))
+        filtros['reformas'][0].append(f"lote IN ({pl})"); filtros['reformas'][1].extend(lotes)
+        filtros['pendencias'][0].append(f"frota_vinculada IN (SELECT frota FROM reformas WHERE lote IN ({pl}))")
+        filtros['pendencias'][1].extend(lotes)
+    for aba, tabela in (('Máquinas', 'reformas'), ('Pendências', 'pendencias')):
+        where, params = filtros[tabela]
+        yield aba, tabela, (" WHERE " + " AND ".join(where)) if where else "", params
+
+
+@medir('exportacao')
+def exportar_excel(caminho, data_inicio=None, data_fim=None, lotes=None, tamanho_bloco=TAMANHO_BLOCO,
+                   progresso=None):
+    # Grava o .xlsx em `caminho` e devolve o total de linhas exportadas por aba.
+    # progresso(feitas, total) é chamado a cada bloco (o total vem de um count(*) antes)
+    totais = {}
+    wb = xlsxwriter.Workbook(caminho, {'constant_memory': True, 'tmpdir': tempfile.gettempdir()})
+    try:
+        negrito = wb.add_format({'bold': True})
+        with conexao() as conn:
+            consultas = list(_consultas(data_inicio, data_fim, lotes))
+            total = sum(conn.execute(f"SELECT count(*) FROM {t}{w}", p).fetchone()[0] for _, t, w, p in consultas)
+            feitas = 0
+            for aba, tabela, where, params in consultas:
+                cols = _colunas(conn, tabela)
+                ws = wb.add_worksheet(aba)
+                ws.write_row(0, 0, cols, negrito)
+                cur = conn.execute(f"SELECT {', '.join(cols)} FROM {tabela}{where} ORDER BY id", params)
+                n = 0
+                while True:
+                    bloco = cur.fetchmany(tamanho_bloco)
+                    if not bloco: break
+                    for linha in bloco:
+                        n += 1
+                        ws.write_row(n, 0, linha)
+                    feitas += len(bloco)
+                    if progresso: progresso(feitas, total)
+                totais[aba] = n
+    finally:
+        wb.close()
+    return totais
+
+
+def gerar_excel(data_inicio=None, data_fim=None, lotes=None):
+    # Exporta para um arquivo temporário e devolve os bytes finais; o arquivo é removido em seguida
+    fd, caminho = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        exportar_excel(caminho, data_inicio, data_fim, lotes)
+        with open(caminho, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(caminho)
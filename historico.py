@@ -0,0 +1,67 @@
+from cache import cache_por_versao
+from db import ler_sql
+from migracoes import CAMPO_PROGRESSO, CAMPO_STATUS, ENTIDADES
+
+# --- HISTÓRICO E AGREGADOS DE FLUXO ---
+# Leituras das tabelas mantidas pelos triggers de migracoes._criar_historico. Os agregados têm uma
+# linha por lote/gestor/dia, então cada consulta lê poucas linhas mesmo com anos de eventos.
+# `entidade`: 'reformas' (máquinas) ou 'pendencias' (tarefas do Kanban).
+
+
+@cache_por_versao('reformas', 'pendencias')
+def ciclo_por_lote(entidade='reformas'):
+    # lote, concluídas e média de dias do início até o status final
+    return ler_sql("""SELECT lote, sum(concluidas) AS concluidas, round(sum(soma_dias) / sum(concluidas), 1) AS media_dias
+                      FROM ciclo_resumo WHERE entidade = ? GROUP BY lote ORDER BY lote""", (ENTIDADES[entidade],))
+
+
+@cache_por_versao('reformas', 'pendencias', 'gestores')
+def ciclo_por_gestor(entidade='reformas'):
+    return ler_sql("""SELECT ifnull(g.nome, '(sem gestor)') AS gestor, sum(c.concluidas) AS concluidas,
+                             round(sum(c.soma_dias) / sum(c.concluidas), 1) AS media_dias
+                      FROM ciclo_resumo c LEFT JOIN gestores g ON g.id = c.gestor
+                      WHERE c.entidade = ? GROUP BY 1 ORDER BY 1""", (ENTIDADES[entidade],))
+
+
+@cache_por_versao('reformas', 'pendencias')
+def burndown(lotes, entidade='reformas'):
+    # Por lote e dia: entradas, saídas (finalizadas), removidas e o saldo em aberto acumulado
+    return ler_sql(f"""SELECT lote, dia, entradas, saidas, removidas,
+                              sum(entradas - saidas - removidas) OVER (PARTITION BY lote ORDER BY dia) AS em_aberto
+                       FROM fluxo_diario WHERE entidade = ? AND lote IN ({','.join('?' * len(lotes))})
+                       ORDER BY lote, dia""", [ENTIDADES[entidade]] + list(lotes))
+
+
+@cache_por_versao('reformas', 'pendencias')
+def vazao_semanal(entidade='reformas', lotes=None):
+    # Finalizadas por semana (segunda-feira de início), de todos os lotes ou só dos informados
+    where, params = "", [ENTIDADES[entidade]]
+    if lotes is not None:
+        where = f" AND lote IN ({','.join('?' * len(lotes))})"; params += list(lotes)
+    return ler_sql(f"""SELECT date(dia, '-6 days', 'weekday 1') AS semana, sum(saidas) AS finalizadas
+                       FROM fluxo_diario WHERE entidade = ?{where} GROUP BY 1 HAVING sum(saidas) > 0
+                       ORDER BY 1""", params)
+
+
+@cache_por_versao('reformas', 'pendencias')
+def tempo_em_status(entidade='reformas'):
+    # Média de dias que um item passa em cada status antes de sair dele
+    return ler_sql("""SELECT ifnull(s.nome, '(sem status)') AS status, t.n AS passagens,
+                             round(t.segundos / 86400.0 / t.n, 2) AS media_dias
+                      FROM tempo_status t LEFT JOIN codigos_status s ON s.id = t.status
+                      WHERE t.entidade = ? ORDER BY media_dias DESC""", (ENTIDADES[entidade],))
+
+
+@cache_por_versao('reformas', 'pendencias')
+def historico_item(linha_id, entidade='reformas'):
+    # Eventos de um item, mais recentes primeiro, com os códigos de status traduzidos
+    return ler_sql(f"""SELECT datetime(e.ts, 'unixepoch', 'localtime') AS quando,
+                              CASE e.campo WHEN {CAMPO_STATUS} THEN 'status' WHEN {CAMPO_PROGRESSO} THEN 'progresso' END
+                                  AS campo,
+                              CASE e.campo WHEN {CAMPO_STATUS} THEN d.nome ELSE CAST(e.de AS TEXT) END AS de,
+                              CASE e.campo WHEN {CAMPO_STATUS} THEN p.nome ELSE CAST(e.para AS TEXT) END AS para
+                       FROM eventos e
+                       LEFT JOIN codigos_status d ON e.campo = {CAMPO_STATUS} AND d.id = e.de
+                       LEFT JOIN codigos_status p ON e.campo = {CAMPO_STATUS} AND p.id = e.para
+                       WHERE e.entidade = ? AND e.linha_id = ? ORDER BY e.id DESC""",
+                   (ENTIDADES[entidade], int(linha_id)))
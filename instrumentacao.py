@@ -0,0 +1,238 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+
+# --- INSTRUMENTAÇÃO DOS CAMINHOS QUENTES ---
+# Mede conexões, SQL (cursor de db.py), carregadores (cache_por_versao), escritas, renderização e
+# exportações. Só é medido o que roda dentro de uma coleta aberta na thread: um rerun do Streamlit
+# (novo_rerun) ou um trabalho em segundo plano. Desligado, nenhuma coleta é aberta e cada ponto
+# medido custa uma leitura de threading.local.
+LIGADA = os.environ.get('REFORMA_INSTRUMENTACAO', '') not in ('', '0')
+ARQUIVO_LOG = os.environ.get('REFORMA_LOG_JSON') or None  # JSON lines, uma linha por coleta
+CHAVE_ADMIN = os.environ.get('REFORMA_ADMIN', '')  # ?admin=<chave> mostra o painel de desempenho
+HISTORICO_RERUNS = 50  # reruns guardados por sessão
+MAX_MEDIDAS = 5000  # por coleta; o excedente só é contado
+
+
+class _Local(threading.local):
+    coleta = None  # padrão na classe: ler o atributo numa thread sem coleta não levanta AttributeError
+
+
+_local = _Local()
+_lock = threading.Lock()
+_agregados = {}  # (tipo, nome) -> [n, segundos, máximo, linhas]
+_RE_LISTA = re.compile(r'\?(?:\s*,\s*\?)+')
+
+
+def ligada(): return LIGADA
+
+
+def ligar(valor=True):
+    global LIGADA
+    LIGADA = bool(valor)
+
+
+def normalizar_sql(sql):
+    # Espaços colapsados e listas "?,?,?" viram "?…", para consultas com IN de tamanhos diferentes agruparem
+    return _RE_LISTA.sub('?…', ' '.join(str(sql).split()))
+
+
+# --- COLETA ---
+class Coleta:
+    def __init__(self, rotulo):
+        self.rotulo = rotulo
+        self.inicio = datetime.now().isoformat(timespec='seconds')
+        self._t0 = time.perf_counter()
+        self._ultimo = self._t0
+        self.segundos = None
+        self.medidas = []  # [tipo, nome, segundos, linhas]
+        self.descartadas = 0
+
+    def medir(self, tipo, nome, segundos, linhas=0):
+        self._ultimo = time.perf_counter()
+        if len(self.medidas) >= MAX_MEDIDAS:
+            self.descartadas += 1
+            return None
+        m = [tipo, nome, segundos, linhas]
+        self.medidas.append(m)
+        return m
+
+    def fechar(self, fim=None):
+        # Sem `fim` (script interrompido por st.stop/st.rerun) vale o fim da última medida
+        if self.segundos is None:
+            self.segundos = (fim or self._ultimo) - self._t0
+            _agregar(self.medidas)
+            _gravar_log(self)
+        return self
+
+    def tabela(self):
+        df = pd.DataFrame(self.medidas, columns=['tipo', 'nome', 'segundos', 'linhas'])
+        df.insert(2, 'ms', (df.pop('segundos') * 1000).round(2))
+        return df
+
+    def resumo(self):
+        sql = [m for m in self.medidas if m[0] == 'sql']
+        return {'rotulo': self.rotulo, 'inicio': self.inicio, 'segundos': round(self.segundos or 0.0, 4),
+                'consultas': len(sql), 'segundos_sql': round(sum(m[2] for m in sql), 4),
+                'linhas_sql': int(sum(m[3] for m in sql)), 'medidas': len(self.medidas) + self.descartadas}
+
+
+def coleta_atual():
+    return _local.coleta
+
+
+def _agregar(medidas):
+    with _lock:
+        for tipo, nome, seg, linhas in medidas:
+            a = _agregados.get((tipo, nome))
+            if a is None:
+                _agregados[(tipo, nome)] = [1, seg, seg, linhas]
+            else:
+                a[0] += 1; a[1] += seg; a[2] = max(a[2], seg); a[3] += linhas
+
+
+def _gravar_log(c):
+    if not ARQUIVO_LOG:
+        return
+    linha = json.dumps(dict(c.resumo(), detalhe=[[t, n, round(s, 6), l] for t, n, s, l in c.medidas]),
+                       ensure_ascii=False)
+    with _lock, open(ARQUIVO_LOG, 'a', encoding='utf-8') as f:
+        f.write(linha + '\n')
+
+
+def abrir_coleta(rotulo):
+    # Torna a coleta a atual da thread; a anterior (se houver) é fechada
+    anterior = coleta_atual()
+    if anterior is not None:
+        anterior.fechar()
+    _local.coleta = Coleta(rotulo) if LIGADA else None
+    return _local.coleta
+
+
+def fechar_coleta():
+    c = coleta_atual()
+    _local.coleta = None
+    return c.fechar(time.perf_counter()) if c is not None else None
+
+
+@contextmanager
+def coleta(rotulo):
+    # Para trabalhos fora do Streamlit (threads do pool, linha de comando)
+    c = abrir_coleta(rotulo)
+    try:
+        yield c
+    finally:
+        if coleta_atual() is c: fechar_coleta()
+
+
+def novo_rerun(estado, rotulo=''):
+    # Início do script: fecha o rerun anterior da sessão (`estado` é o st.session_state), guarda o
+    # resumo no histórico e nos agregados da sessão e abre a coleta deste rerun
+    anterior = estado.pop('instr_coleta', None)
+    if anterior is not None:
+        anterior.fechar()
+        estado.setdefault('instr_reruns', deque(maxlen=HISTORICO_RERUNS)).append(anterior.resumo())
+        estado['instr_ultimo'] = anterior
+        sessao = estado.setdefault('instr_sessao', {})
+        for tipo, nome, seg, linhas in anterior.medidas:
+            a = sessao.setdefault((tipo, nome), [0, 0.0, 0.0, 0])
+            a[0] += 1; a[1] += seg; a[2] = max(a[2], seg); a[3] += linhas
+    _local.coleta = None
+    c = abrir_coleta(rotulo)
+    if c is not None:
+        estado['instr_coleta'] = c
+    return c
+
+
+def rotular(rotulo):
+    c = coleta_atual()
+    if c is not None: c.rotulo = rotulo
+
+
+# --- PONTOS DE MEDIDA ---
+def registrar(tipo, nome, segundos, linhas=0):
+    c = coleta_atual()
+    return c.medir(tipo, nome, segundos, linhas) if c is not None else None
+
+
+def contar_linhas(valor, args=()):
+    # len do resultado; para HTML, figuras e arquivos, o tamanho do DataFrame recebido
+    if isinstance(valor, (pd.DataFrame, pd.Series, list, tuple, dict)):
+        return len(valor)
+    return len(args[0]) if args and isinstance(args[0], pd.DataFrame) else 0
+
+
+def medir(tipo, nome=None):
+    # Decorador: tempo e linhas (len do resultado) de cada chamada, com o nome da função
+    def decorador(func):
+        rotulo = nome or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def envolvida(*args, **kwargs):
+            c = _local.coleta
+            if c is None:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            valor = func(*args, **kwargs)
+            c.medir(tipo, rotulo, time.perf_counter() - t0, contar_linhas(valor, args))
+            return valor
+
+        return envolvida
+
+    return decorador
+
+
+_nada = nullcontext()
+
+
+def trecho(tipo, nome):
+    # with trecho('render', 'Kanban: colunas'): ... — para blocos do app.py que não são uma função
+    return _trecho(tipo, nome) if _local.coleta is not None else _nada
+
+
+@contextmanager
+def _trecho(tipo, nome):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(tipo, nome, time.perf_counter() - t0)
+
+
+# --- RELATÓRIOS ---
+def _frame(dados):
+    df = pd.DataFrame([(t, n, *v) for (t, n), v in dados.items()],
+                      columns=['tipo', 'nome', 'chamadas', 'total_s', 'max_s', 'linhas'])
+    df['media_ms'] = (df['total_s'] / df['chamadas'] * 1000).round(2)
+    return df.sort_values('total_s', ascending=False, ignore_index=True)
+
+
+def agregados(sessao=None):
+    # Agregados por (tipo, nome): do processo inteiro ou do dicionário de uma sessão (instr_sessao)
+    if sessao is None:
+        with _lock:
+            sessao = {k: list(v) for k, v in _agregados.items()}
+    return _frame(sessao)
+
+
+def consultas_lentas(n=20, sessao=None, ordem='max_s'):
+    df = agregados(sessao)
+    return df[df['tipo'] == 'sql'].sort_values(ordem, ascending=False).head(n).reset_index(drop=True)
+
+
+def fases_lentas(n=20, sessao=None, ordem='total_s'):
+    df = agregados(sessao)
+    return df[df['tipo'] != 'sql'].sort_values(ordem, ascending=False).head(n).reset_index(drop=True)
+
+
+def zerar():
+    with _lock:
+        _agregados.clear()
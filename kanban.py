@@ -0,0 +1,62 @@
+from html import escape
+
+import numpy as np
+import pandas as pd
+
+from instrumentacao import medir
+from prazos import dia_iso
+
+# --- RENDERIZAÇÃO DO KANBAN EM LOTE ---
+# Calcula prazo, cores e rótulos da coluna inteira com operações do pandas e devolve um
+# único bloco HTML, em vez de um st.markdown (e quatro botões) por cartão.
+STATUS_BG = {"A Fazer": "#ffffff", "Fazendo": "#d4e6f1", "Feito": "#d5f5e3"}  # Fundos coloridos
+
+
+def _texto(serie):
+    return serie.fillna('').astype(str).map(escape)
+
+
+def classificar_prazos(df, hoje=None):
+    # (classe, prazo dd/mm/aaaa). classe: 'feito' / 'atrasada' / 'hoje' / 'futura' / '' (sem prazo).
+    # As consultas de prazos.py já trazem as duas colunas do SQL; sem elas compara o texto ISO
+    # direto, também sem converter data a data
+    if 'classe_prazo' in df.columns:
+        return df['classe_prazo'], df['prazo_br']
+    hoje = dia_iso(hoje)
+    dp = df['data_prazo'].fillna('').astype(str).str[:10]
+    classe = np.select([dp == '', df['status'] == "Feito", dp < hoje, dp == hoje],
+                       ['', 'feito', 'atrasada', 'hoje'], 'futura')
+    br = (dp.str[8:10] + '/' + dp.str[5:7] + '/' + dp.str[:4]).where(dp != '', '')
+    return pd.Series(classe, index=df.index), br
+
+
+@medir('render')
+def html_coluna(df, hoje=None):
+    if df.empty:
+        return ""
+    classe, br = classificar_prazos(df, hoje)
+    dd = br.str[:5]
+    prazo = pd.Series(np.select(
+        [classe == 'feito', classe == 'atrasada', classe == 'hoje', classe == 'futura'],
+        ["<span style='color:#27ae60'>✔ " + dd + "</span>",
+         "<span style='color:#c0392b; font-weight:bold'>🔥 " + dd + "</span>",
+         "<span style='color:#e67e22; font-weight:bold'>⚠️ Hoje</span>",
+         "📅 " + dd], ''), index=df.index)
+    prio = _texto(df['prioridade'])
+    bg = df['status'].map(STATUS_BG).fillna("#fff")
+    frota = _texto(df['frota_vinculada']).replace('', 'Geral')
+    cards = ('<div class="kanban-card prio-' + prio + '" style="background-color: ' + bg + ' !important;">'
+             '<div style="display:flex; justify-content:space-between; margin-bottom:5px;">'
+             '<span class="status-badge">' + prio + '</span>'
+             '<span style="font-size:12px; color:#888;">#' + df['id'].astype(str) + '</span>'
+             '<span style="font-weight:bold; font-size:14px; color:#555;">👤 ' + _texto(df['responsavel']) + '</span>'
+             '</div>'
+             '<div class="k-title">' + _texto(df['titulo']) + '</div>'
+             '<div class="k-desc">' + _texto(df['descricao']) + '</div>'
+             '<div class="k-meta"><span>🚜 ' + frota + '</span><span>' + prazo + '</span></div>'
+             '</div>')
+    return ''.join(cards.tolist())
+
+
+def rotulos_cartoes(df):
+    return dict(zip(df['id'].tolist(), ('#' + df['id'].astype(str) + ' - ' + df['titulo'].fillna('')).tolist()))
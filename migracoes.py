@@ -0,0 +1,649 @@
+import sqlite3
+import threading
+
+import db
+
+# --- MIGRAÇÕES DE ESQUEMA ---
+# Cada migração roda uma única vez por banco: o número da última aplicada fica em
+# PRAGMA user_version. garantir_esquema() só consulta o banco na primeira chamada do processo,
+# então os reruns do Streamlit não fazem nenhum trabalho de esquema.
+
+
+def _colunas(c, tabela):
+    return {r[1] for r in c.execute(f"PRAGMA table_info({tabela})")}
+
+
+def _esquema_base(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS reformas
+                 (
+                     id
+                     INTEGER
+                     PRIMARY
+                     KEY
+                     AUTOINCREMENT,
+                     lote
+                     TEXT,
+                     frota
+                     TEXT,
+                     modelo
+                     TEXT,
+                     responsavel
+                     TEXT,
+                     data_inicio
+                     DATE,
+                     data_previsao
+                     DATE,
+                     status
+                     TEXT,
+                     progresso
+                     INTEGER,
+                     observacao
+                     TEXT
+                 )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS gestores
+                 (
+                     id
+                     INTEGER
+                     PRIMARY
+                     KEY
+                     AUTOINCREMENT,
+                     nome
+                     TEXT
+                     UNIQUE,
+                     setor
+                     TEXT
+                 )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS status_config
+                 (
+                     nome
+                     TEXT
+                     UNIQUE,
+                     cor
+                     TEXT
+                 )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS pendencias
+                 (
+                     id
+                     INTEGER
+                     PRIMARY
+                     KEY
+                     AUTOINCREMENT,
+                     titulo
+                     TEXT,
+                     descricao
+                     TEXT,
+                     responsavel
+                     TEXT,
+                     frota_vinculada
+                     TEXT,
+                     prioridade
+                     TEXT,
+                     status
+                     TEXT,
+                     data_criacao
+                     DATE,
+                     data_prazo
+                     DATE
+                 )''')
+    if 'data_prazo' not in _colunas(c, 'pendencias'):
+        c.execute("ALTER TABLE pendencias ADD COLUMN data_prazo DATE")
+    if c.execute('SELECT count(*) FROM gestores').fetchone()[0] == 0:
+        c.executemany("INSERT INTO gestores (nome, setor) VALUES (?, ?)",
+                      [('Wendell', 'Coord'), ('Oficina', 'Manut'), ('Terceiro', 'Ext')])
+    if c.execute('SELECT count(*) FROM status_config').fetchone()[0] == 0:
+        c.executemany("INSERT INTO status_config (nome, cor) VALUES (?, ?)",
+                      [("Aguardando", "#95a5a6"), ("Concluído", "#2ecc71")])
+
+
+def _indices_kanban(c):
+    c.execute("CREATE INDEX IF NOT EXISTS ix_pendencias_status_resp_prazo "
+              "ON pendencias (status, responsavel, data_prazo)")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_pendencias_status_id ON pendencias (status, id)")
+
+
+# --- RASTREAMENTO DE ALTERAÇÕES ---
+# log_alteracoes guarda só a última alteração de cada linha (o trigger apaga a anterior), então
+# cresce com o tamanho da tabela e não com o número de escritas. seq é a versão global e também
+# vira a coluna versao da linha alterada.
+TABELAS_RASTREADAS = ('reformas', 'pendencias')
+
+
+def _criar_rastreamento(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS log_alteracoes
+                 (
+                     seq
+                     INTEGER
+                     PRIMARY
+                     KEY
+                     AUTOINCREMENT,
+                     tabela
+                     TEXT
+                     NOT
+                     NULL,
+                     linha_id
+                     INTEGER
+                     NOT
+                     NULL,
+                     operacao
+                     TEXT
+                     NOT
+                     NULL
+                 )''')
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_log_linha ON log_alteracoes (tabela, linha_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_log_seq ON log_alteracoes (tabela, seq)")
+    for t in TABELAS_RASTREADAS:
+        if 'versao' not in _colunas(c, t):
+            c.execute(f"ALTER TABLE {t} ADD COLUMN versao INTEGER NOT NULL DEFAULT 0")
+        for evento, ref, op in (('INSERT', 'NEW', 'I'), ('UPDATE', 'NEW', 'U'), ('DELETE', 'OLD', 'D')):
+            marcar = '' if op == 'D' else (f"UPDATE {t} SET versao = (SELECT max(seq) FROM log_alteracoes) "
+                                           f"WHERE id = NEW.id;")
+            # o UPDATE de versao feito pelo trigger de INSERT não deve gerar um segundo registro
+            quando = 'WHEN NEW.versao IS OLD.versao' if op == 'U' else ''
+            # DELETE + INSERT em vez de INSERT OR REPLACE: numa ação de chave estrangeira (CASCADE/SET NULL)
+            # o SQLite impõe ABORT aos triggers e o REPLACE viraria erro de UNIQUE
+            c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{t}_log_{op.lower()} AFTER {evento} ON {t} {quando}
+                          BEGIN
+                              DELETE FROM log_alteracoes WHERE tabela = '{t}' AND linha_id = {ref}.id;
+                              INSERT INTO log_alteracoes (tabela, linha_id, operacao)
+                              VALUES ('{t}', {ref}.id, '{op}');
+                              {marcar}
+                          END""")
+
+
+# --- RESUMO POR LOTE/STATUS ---
+# Agregado materializado de reformas mantido pelos triggers: os KPIs do painel leem algumas
+# linhas daqui em vez de varrer todas as máquinas. qtd_progresso conta só progresso não nulo,
+# para a média bater com a do pandas (que ignora NaN). lote/status nulos viram ''.
+def _criar_resumo_lotes(c):
+    existia = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='resumo_lotes'").fetchone()
+    c.execute('''CREATE TABLE IF NOT EXISTS resumo_lotes
+                 (
+                     lote
+                     TEXT
+                     NOT
+                     NULL,
+                     status
+                     TEXT
+                     NOT
+                     NULL,
+                     qtd
+                     INTEGER
+                     NOT
+                     NULL,
+                     qtd_progresso
+                     INTEGER
+                     NOT
+                     NULL,
+                     soma_progresso
+                     INTEGER
+                     NOT
+                     NULL,
+                     PRIMARY KEY (lote, status)
+                 ) WITHOUT ROWID''')
+    somar = """INSERT INTO resumo_lotes (lote, status, qtd, qtd_progresso, soma_progresso)
+               VALUES (ifnull(NEW.lote, ''), ifnull(NEW.status, ''), 1, NEW.progresso IS NOT NULL,
+                       ifnull(NEW.progresso, 0))
+               ON CONFLICT (lote, status) DO UPDATE SET qtd = qtd + 1,
+                   qtd_progresso = qtd_progresso + excluded.qtd_progresso,
+                   soma_progresso = soma_progresso + excluded.soma_progresso;"""
+    subtrair = """UPDATE resumo_lotes SET qtd = qtd - 1, qtd_progresso = qtd_progresso - (OLD.progresso IS NOT NULL),
+                      soma_progresso = soma_progresso - ifnull(OLD.progresso, 0)
+                  WHERE lote = ifnull(OLD.lote, '') AND status = ifnull(OLD.status, '');
+                  DELETE FROM resumo_lotes WHERE lote = ifnull(OLD.lote, '') AND status = ifnull(OLD.status, '')
+                      AND qtd <= 0;"""
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_reformas_resumo_i AFTER INSERT ON reformas BEGIN {somar} END")
+    c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_reformas_resumo_d AFTER DELETE ON reformas BEGIN {subtrair} END")
+    c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_reformas_resumo_u AFTER UPDATE OF lote, status, progresso
+                  ON reformas BEGIN {subtrair} {somar} END""")
+    if not existia:
+        reconstruir_resumo_lotes(c)
+
+
+def reconstruir_resumo_lotes(c):
+    c.execute("DELETE FROM resumo_lotes")
+    c.execute("""INSERT INTO resumo_lotes (lote, status, qtd, qtd_progresso, soma_progresso)
+                 SELECT ifnull(lote, ''), ifnull(status, ''), count(*), count(progresso), ifnull(sum(progresso), 0)
+                 FROM reformas GROUP BY 1, 2""")
+
+
+# --- ÍNDICE DE BUSCA (FTS5) ---
+# Uma tabela FTS5 para máquinas e pendências. O rowid codifica a origem (id*2 para reformas,
+# id*2+1 para pendencias), assim os triggers atualizam/removem a entrada pela chave, sem varredura.
+BUSCA_ORIGENS = {
+    'reformas': (0, "NEW.frota, NEW.modelo, NEW.observacao, '', ''",
+                 "SELECT id*2, frota, modelo, observacao, '', '' FROM reformas"),
+    'pendencias': (1, "NEW.frota_vinculada, '', '', NEW.titulo, NEW.descricao",
+                   "SELECT id*2+1, frota_vinculada, '', '', titulo, descricao FROM pendencias"),
+}
+
+
+def _criar_busca(c):
+    existia = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='busca_fts'").fetchone()
+    c.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS busca_fts USING fts5(
+                     frota, modelo, observacao, titulo, descricao,
+                     tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')""")
+    for t, (par, valores, _) in BUSCA_ORIGENS.items():
+        inserir = f"INSERT INTO busca_fts (rowid, frota, modelo, observacao, titulo, descricao) " \
+                  f"VALUES (NEW.id*2+{par}, {valores});"
+        remover = f"DELETE FROM busca_fts WHERE rowid = OLD.id*2+{par};"
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_busca_i AFTER INSERT ON {t} BEGIN {inserir} END")
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_busca_d AFTER DELETE ON {t} BEGIN {remover} END")
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_busca_u AFTER UPDATE ON {t} BEGIN {remover} {inserir} END")
+    if not existia:
+        for _, _, select in BUSCA_ORIGENS.values():
+            c.execute(f"INSERT INTO busca_fts (rowid, frota, modelo, observacao, titulo, descricao) {select}")
+
+
+# --- CHAVES ESTRANGEIRAS E ÍNDICES DAS CONSULTAS QUENTES ---
+# O SQLite não adiciona FOREIGN KEY com ALTER TABLE: reformas e pendencias são recriadas com
+# responsavel -> gestores(nome). Renomear um gestor propaga para as máquinas e tarefas; removê-lo
+# deixa o responsável vazio. Nomes que já estavam em uso sem cadastro viram gestores sem setor.
+TABELAS_FK = {
+    'reformas': """id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   lote TEXT,
+                   frota TEXT,
+                   modelo TEXT,
+                   responsavel TEXT REFERENCES gestores (nome) ON UPDATE CASCADE ON DELETE SET NULL,
+                   data_inicio DATE,
+                   data_previsao DATE,
+                   status TEXT,
+                   progresso INTEGER,
+                   observacao TEXT,
+                   versao INTEGER NOT NULL DEFAULT 0""",
+    'pendencias': """id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     titulo TEXT,
+                     descricao TEXT,
+                     responsavel TEXT REFERENCES gestores (nome) ON UPDATE CASCADE ON DELETE SET NULL,
+                     frota_vinculada TEXT,
+                     prioridade TEXT,
+                     status TEXT,
+                     data_criacao DATE,
+                     data_prazo DATE,
+                     versao INTEGER NOT NULL DEFAULT 0""",
+}
+
+
+def _recriar_com_fk(c, tabela):
+    cols = ', '.join(r[1] for r in c.execute(f"PRAGMA table_info({tabela})"))
+    seq = c.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (tabela,)).fetchone()
+    c.execute(f"CREATE TABLE {tabela}_nova ({TABELAS_FK[tabela]})")
+    c.execute(f"INSERT INTO {tabela}_nova ({cols}) SELECT {cols} FROM {tabela}")
+    c.execute(f"DROP TABLE {tabela}")  # leva junto índices e triggers, recriados logo abaixo
+    c.execute(f"ALTER TABLE {tabela}_nova RENAME TO {tabela}")
+    if seq:
+        c.execute("UPDATE sqlite_sequence SET seq=max(seq, ?) WHERE name=?", (seq[0], tabela))
+
+
+def _chaves_estrangeiras(c):
+    c.execute("""INSERT OR IGNORE INTO gestores (nome)
+                 SELECT responsavel FROM reformas WHERE responsavel IS NOT NULL AND responsavel <> ''
+                 UNION SELECT responsavel FROM pendencias WHERE responsavel IS NOT NULL AND responsavel <> ''""")
+    for t in TABELAS_FK:
+        c.execute(f"UPDATE {t} SET responsavel=NULL WHERE responsavel=''")
+        _recriar_com_fk(c, t)
+    _indices_kanban(c)
+    _criar_rastreamento(c)
+    _criar_resumo_lotes(c)
+    _criar_busca(c)
+    c.execute("CREATE INDEX IF NOT EXISTS ix_reformas_lote_status ON reformas (lote, status)")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_reformas_frota ON reformas (frota)")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_reformas_responsavel ON reformas (responsavel)")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_pendencias_frota ON pendencias (frota_vinculada)")
+    problemas = c.execute("PRAGMA foreign_key_check").fetchall()
+    if problemas:
+        raise sqlite3.IntegrityError(f"chaves estrangeiras inválidas após a migração: {problemas[:5]}")
+
+
+# --- DATAS EM TEXTO ISO ---
+# As colunas DATE passam a guardar só AAAA-MM-DD (ou NULL): comparar o texto é comparar a data,
+# e as consultas de prazo usam índice sem converter linha a linha. Valores antigos em outro formato
+# (com hora, dd/mm/aaaa) são convertidos; o que não é data vira NULL, como já era tratado na tela.
+# Daqui em diante os triggers recusam gravações fora do padrão.
+COLUNAS_DATA = {'reformas': ('data_inicio', 'data_previsao'), 'pendencias': ('data_criacao', 'data_prazo')}
+
+
+def _data_iso(col):
+    return f"""CASE WHEN date({col}) IS NOT NULL THEN date({col})
+                    WHEN {col} GLOB '[0-3][0-9]/[01][0-9]/[12][0-9][0-9][0-9]*'
+                    THEN date(substr({col}, 7, 4) || '-' || substr({col}, 4, 2) || '-' || substr({col}, 1, 2))
+               END"""
+
+
+def _datas_iso(c):
+    for t, cols in COLUNAS_DATA.items():
+        for col in cols:
+            c.execute(f"UPDATE {t} SET {col} = {_data_iso(col)} WHERE {col} IS NOT {_data_iso(col)}")
+        invalida = ' OR '.join(f"(NEW.{col} IS NOT NULL AND NEW.{col} IS NOT date(NEW.{col}))" for col in cols)
+        recusar = f"SELECT RAISE(ABORT, 'data fora do padrão AAAA-MM-DD em {t}');"
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_datas_i BEFORE INSERT ON {t} WHEN {invalida} "
+                  f"BEGIN {recusar} END")
+        c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_datas_u BEFORE UPDATE OF {', '.join(cols)} ON {t} "
+                  f"WHEN {invalida} BEGIN {recusar} END")
+    # Índices parciais só com o que ainda está em aberto: os alertas de atraso varrem poucas linhas
+    # mesmo com todo o histórico no banco. As consultas de prazos.py repetem o mesmo WHERE.
+    c.execute("CREATE INDEX IF NOT EXISTS ix_pendencias_prazo_aberto ON pendencias (data_prazo) "
+              "WHERE status <> 'Feito' AND data_prazo IS NOT NULL")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_reformas_previsao_aberta ON reformas (data_previsao) "
+              "WHERE status IS NOT 'Concluído' AND data_previsao IS NOT NULL")
+
+
+# --- TRABALHOS EM SEGUNDO PLANO ---
+# Fila de exportações/relatórios de trabalhos.py. chave = tipo + parâmetros + versão dos dados,
+# usada para reaproveitar um trabalho igual em andamento ou já pronto.
+def _criar_trabalhos(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS trabalhos
+                 (
+                     id
+                     INTEGER
+                     PRIMARY
+                     KEY
+                     AUTOINCREMENT,
+                     tipo
+                     TEXT
+                     NOT
+                     NULL,
+                     chave
+                     TEXT
+                     NOT
+                     NULL,
+                     estado
+                     TEXT
+                     NOT
+                     NULL,
+                     progresso
+                     REAL
+                     NOT
+                     NULL
+                     DEFAULT
+                     0,
+                     mensagem
+                     TEXT,
+                     arquivo
+                     TEXT,
+                     nome_arquivo
+                     TEXT,
+                     criado_em
+                     TEXT
+                     NOT
+                     NULL,
+                     atualizado_em
+                     TEXT
+                     NOT
+                     NULL
+                 )''')
+    c.execute("CREATE INDEX IF NOT EXISTS ix_trabalhos_chave ON trabalhos (chave, estado)")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_trabalhos_estado ON trabalhos (estado, atualizado_em)")
+
+
+# O trigger de UPDATE da busca disparava em qualquer UPDATE, inclusive no carimbo de versao feito
+# pelo trigger de INSERT do log: cada linha nova era indexada duas vezes. Agora só as colunas
+# indexadas reindexam (metade do custo de um INSERT em massa, ver benchmarks/bench_carga.py).
+BUSCA_COLUNAS = {'reformas': 'frota, modelo, observacao', 'pendencias': 'frota_vinculada, titulo, descricao'}
+
+
+def _busca_so_colunas_indexadas(c):
+    for t, (par, valores, _) in BUSCA_ORIGENS.items():
+        inserir = f"INSERT INTO busca_fts (rowid, frota, modelo, observacao, titulo, descricao) " \
+                  f"VALUES (NEW.id*2+{par}, {valores});"
+        remover = f"DELETE FROM busca_fts WHERE rowid = OLD.id*2+{par};"
+        c.execute(f"DROP TRIGGER IF EXISTS trg_{t}_busca_u")
+        c.execute(f"CREATE TRIGGER trg_{t}_busca_u AFTER UPDATE OF {BUSCA_COLUNAS[t]} ON {t} "
+                  f"BEGIN {remover} {inserir} END")
+
+
+# --- HISTÓRICO DE STATUS E PROGRESSO ---
+# eventos só recebe inclusões: cada mudança de status ou progresso de uma máquina/pendência vira uma
+# linha só de inteiros (ts unix, entidade, id, campo, de, para), com o status codificado em
+# codigos_status. Os mesmos triggers mantêm os agregados: ciclos (dias do início até o status final,
+# por item), ciclo_resumo (soma por lote/gestor), fluxo_diario (entradas, saídas e remoções por
+# lote/dia, o burndown) e tempo_status (tempo gasto em cada status). Gestor entra pelo id de
+# gestores, então renomear não parte o histórico. O que já existia no banco entra com um evento
+# inicial na data da migração; itens já finalizados ficam fora do fluxo e dos ciclos. Reabrir um
+# item desfaz a saída do dia em que ele foi finalizado (vazão conta itens, não conclusões repetidas).
+ENTIDADES = {'reformas': 0, 'pendencias': 1}
+CAMPO_STATUS, CAMPO_PROGRESSO = 0, 1
+# tabela -> (status final, coluna de início do ciclo, expressão do lote com {r} = NEW/OLD)
+HISTORICO_ORIGENS = {
+    'reformas': ('Concluído', 'data_inicio', "ifnull({r}.lote, '')"),
+    'pendencias': ('Feito', 'data_criacao', "''"),
+}
+_AGORA = "CAST(strftime('%s', 'now') AS INTEGER)"
+_HOJE = "date('now', 'localtime')"
+
+
+def _codigo(expr):
+    return f"(SELECT id FROM codigos_status WHERE nome = {expr})"
+
+
+def _triggers_historico(t, desfazer_saida=True):
+    # desfazer_saida=False: triggers da migração 10, em que reabrir somava uma entrada nova
+    e = ENTIDADES[t]
+    final, inicio, lote_expr = HISTORICO_ORIGENS[t]
+    lote = {r: lote_expr.format(r=r) for r in ('NEW', 'OLD')}
+    final = f"'{final}'"
+
+    def codificar(r):
+        return f"""INSERT INTO codigos_status (nome) SELECT {r}.status
+                   WHERE {r}.status IS NOT NULL AND NOT EXISTS (SELECT 1 FROM codigos_status WHERE nome = {r}.status);"""
+
+    def evento(r, campo, de, para, quando='1'):
+        return f"""INSERT INTO eventos (ts, entidade, linha_id, campo, de, para)
+                   SELECT {_AGORA}, {e}, {r}.id, {campo}, {de}, {para} WHERE {quando};"""
+
+    def fluxo(r, coluna, quando):
+        valores = ', '.join('1' if c == coluna else '0' for c in ('entradas', 'saidas', 'removidas'))
+        return f"""INSERT INTO fluxo_diario (entidade, lote, dia, entradas, saidas, removidas)
+                   SELECT {e}, {lote[r]}, {_HOJE}, {valores} WHERE {quando}
+                   ON CONFLICT (entidade, lote, dia) DO UPDATE SET {coluna} = {coluna} + 1;"""
+
+    def tempo(r):
+        # tempo desde o último evento de status do item, somado ao status que ele está deixando
+        return f"""INSERT INTO tempo_status (entidade, status, n, segundos)
+                   SELECT {e}, ifnull({_codigo(f'{r}.status')}, 0), 1, {_AGORA} - ifnull(
+                       (SELECT ts FROM eventos WHERE entidade = {e} AND linha_id = {r}.id AND campo = {CAMPO_STATUS}
+                        ORDER BY id DESC LIMIT 1), {_AGORA}) WHERE 1
+                   ON CONFLICT (entidade, status) DO UPDATE SET n = n + 1, segundos = segundos + excluded.segundos;"""
+
+    concluir = f"""INSERT INTO ciclos (entidade, linha_id, lote, gestor, dias)
+                   SELECT {e}, NEW.id, {lote['NEW']}, ifnull((SELECT id FROM gestores WHERE nome = NEW.responsavel), 0),
+                          round(ifnull(julianday('now', 'localtime') - julianday(NEW.{inicio}), 0), 2)
+                   WHERE NEW.status = {final};
+                   INSERT INTO ciclo_resumo (entidade, lote, gestor, concluidas, soma_dias)
+                   SELECT entidade, lote, gestor, 1, dias FROM ciclos WHERE entidade = {e} AND linha_id = NEW.id
+                       AND NEW.status = {final}
+                   ON CONFLICT (entidade, lote, gestor) DO UPDATE SET concluidas = concluidas + 1,
+                       soma_dias = soma_dias + excluded.soma_dias;"""
+    # saída somada na conclusão: dia do último evento que levou ao status final, lote guardado em ciclos.
+    # Sem linha em ciclos o item já estava finalizado na migração, fora do fluxo: volta como entrada
+    sem_ciclo = f"NOT EXISTS (SELECT 1 FROM ciclos WHERE entidade = {e} AND linha_id = OLD.id)"
+    desfazer = f"""{fluxo('NEW', 'entradas', f'OLD.status = {final} AND {sem_ciclo}')}
+                   UPDATE fluxo_diario SET saidas = saidas - 1
+                   WHERE OLD.status = {final} AND entidade = {e}
+                       AND lote = (SELECT lote FROM ciclos WHERE entidade = {e} AND linha_id = OLD.id)
+                       AND dia = (SELECT date(ts, 'unixepoch', 'localtime') FROM eventos
+                                  WHERE entidade = {e} AND linha_id = OLD.id AND campo = {CAMPO_STATUS}
+                                      AND para = {_codigo(final)} ORDER BY id DESC LIMIT 1);"""
+    # reaberto: desfaz exatamente o que a conclusão somou (lote/gestor da época, guardados em ciclos)
+    reabrir = f"""UPDATE ciclo_resumo SET concluidas = concluidas - 1,
+                      soma_dias = soma_dias - (SELECT dias FROM ciclos WHERE entidade = {e} AND linha_id = OLD.id)
+                  WHERE OLD.status = {final} AND (entidade, lote, gestor) = (
+                      SELECT entidade, lote, gestor FROM ciclos WHERE entidade = {e} AND linha_id = OLD.id);
+                  DELETE FROM ciclo_resumo WHERE OLD.status = {final} AND entidade = {e} AND concluidas <= 0;
+                  {desfazer if desfazer_saida else ''}
+                  DELETE FROM ciclos WHERE OLD.status = {final} AND entidade = {e} AND linha_id = OLD.id;"""
+    gatilhos = {
+        'i': f"""AFTER INSERT ON {t} BEGIN
+                     {codificar('NEW')}
+                     {evento('NEW', CAMPO_STATUS, 'NULL', _codigo('NEW.status'))}
+                     {fluxo('NEW', 'entradas', '1')}
+                     {fluxo('NEW', 'saidas', f'NEW.status = {final}')}
+                     {concluir}
+                 END""",
+        'status': f"""AFTER UPDATE OF status ON {t} WHEN OLD.status IS NOT NEW.status BEGIN
+                          {codificar('NEW')}
+                          {tempo('OLD')}
+                          {evento('NEW', CAMPO_STATUS, _codigo('OLD.status'), _codigo('NEW.status'))}
+                          {reabrir}
+                          {'' if desfazer_saida else fluxo('NEW', 'entradas', f'OLD.status = {final}')}
+                          {concluir}
+                          {fluxo('NEW', 'saidas', f'NEW.status = {final}')}
+                      END""",
+        'd': f"""AFTER DELETE ON {t} BEGIN
+                     {tempo('OLD')}
+                     {evento('OLD', CAMPO_STATUS, _codigo('OLD.status'), 'NULL')}
+                     {fluxo('OLD', 'removidas', f'OLD.status IS NOT {final}')}
+                 END""",
+    }
+    if t == 'reformas':
+        gatilhos['progresso'] = f"""AFTER UPDATE OF progresso ON {t} WHEN OLD.progresso IS NOT NEW.progresso BEGIN
+                                        {evento('NEW', CAMPO_PROGRESSO, 'OLD.progresso', 'NEW.progresso')}
+                                    END"""
+        # máquina em aberto que muda de lote sai do saldo de um e entra no do outro
+        gatilhos['lote'] = f"""AFTER UPDATE OF lote ON {t}
+                               WHEN OLD.lote IS NOT NEW.lote AND NEW.status IS NOT {final} BEGIN
+                                   {fluxo('OLD', 'removidas', '1')}
+                                   {fluxo('NEW', 'entradas', '1')}
+                               END"""
+    return gatilhos
+
+
+def _criar_historico(c):
+    c.execute("""CREATE TABLE IF NOT EXISTS codigos_status (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE)""")
+    c.execute("""CREATE TABLE IF NOT EXISTS eventos (id INTEGER PRIMARY KEY,
+                                                     ts INTEGER NOT NULL,
+                                                     entidade INTEGER NOT NULL,
+                                                     linha_id INTEGER NOT NULL,
+                                                     campo INTEGER NOT NULL,
+                                                     de INTEGER,
+                                                     para INTEGER)""")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_eventos_linha ON eventos (entidade, linha_id, campo)")
+    c.execute("CREATE INDEX IF NOT EXISTS ix_eventos_ts ON eventos (ts)")
+    c.execute("""CREATE TABLE IF NOT EXISTS ciclos (entidade INTEGER NOT NULL,
+                                                    linha_id INTEGER NOT NULL,
+                                                    lote TEXT NOT NULL,
+                                                    gestor INTEGER NOT NULL,
+                                                    dias REAL NOT NULL,
+                                                    PRIMARY KEY (entidade, linha_id)) WITHOUT ROWID""")
+    c.execute("""CREATE TABLE IF NOT EXISTS ciclo_resumo (entidade INTEGER NOT NULL,
+                                                          lote TEXT NOT NULL,
+                                                          gestor INTEGER NOT NULL,
+                                                          concluidas INTEGER NOT NULL,
+                                                          soma_dias REAL NOT NULL,
+                                                          PRIMARY KEY (entidade, lote, gestor)) WITHOUT ROWID""")
+    c.execute("""CREATE TABLE IF NOT EXISTS fluxo_diario (entidade INTEGER NOT NULL,
+                                                          lote TEXT NOT NULL,
+                                                          dia TEXT NOT NULL,
+                                                          entradas INTEGER NOT NULL,
+                                                          saidas INTEGER NOT NULL,
+                                                          removidas INTEGER NOT NULL,
+                                                          PRIMARY KEY (entidade, lote, dia)) WITHOUT ROWID""")
+    c.execute("""CREATE TABLE IF NOT EXISTS tempo_status (entidade INTEGER NOT NULL,
+                                                          status INTEGER NOT NULL,
+                                                          n INTEGER NOT NULL,
+                                                          segundos INTEGER NOT NULL,
+                                                          PRIMARY KEY (entidade, status)) WITHOUT ROWID""")
+    c.execute("""INSERT OR IGNORE INTO codigos_status (nome)
+                 SELECT nome FROM status_config WHERE nome IS NOT NULL
+                 UNION SELECT status FROM reformas WHERE status IS NOT NULL
+                 UNION SELECT status FROM pendencias WHERE status IS NOT NULL""")
+    for t, (final, inicio, lote_expr) in HISTORICO_ORIGENS.items():
+        e, lote = ENTIDADES[t], lote_expr.format(r=t)
+        c.execute(f"""INSERT INTO eventos (ts, entidade, linha_id, campo, de, para)
+                      SELECT {_AGORA}, {e}, id, {CAMPO_STATUS}, NULL, {_codigo(f'{t}.status')} FROM {t} ORDER BY id""")
+        if t == 'reformas':
+            c.execute(f"""INSERT INTO eventos (ts, entidade, linha_id, campo, de, para)
+                          SELECT {_AGORA}, {e}, id, {CAMPO_PROGRESSO}, NULL, progresso FROM reformas
+                          WHERE progresso IS NOT NULL ORDER BY id""")
+        c.execute(f"""INSERT INTO fluxo_diario (entidade, lote, dia, entradas, saidas, removidas)
+                      SELECT {e}, {lote}, ifnull({inicio}, {_HOJE}), count(*), 0, 0 FROM {t}
+                      WHERE status IS NOT '{final}' GROUP BY 2, 3""")
+        for nome, corpo in _triggers_historico(t, desfazer_saida=False).items():
+            c.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{t}_hist_{nome} {corpo}")
+
+
+def _reabrir_desfaz_saida(c):
+    for t in HISTORICO_ORIGENS:
+        c.execute(f"DROP TRIGGER IF EXISTS trg_{t}_hist_status")
+        c.execute(f"CREATE TRIGGER trg_{t}_hist_status {_triggers_historico(t)['status']}")
+
+
+# --- LOG DOS CADASTROS ---
+# gestores e status_config entram no log_alteracoes (pelo rowid, status_config não tem id) só para
+# terem versão no arquivo, igual em todos os processos: sem coluna versao nem espelho (sincronia.py)
+TABELAS_SO_LOG = ('gestores', 'status_config')
+
+
+def _log_cadastros(c):
+    for t in TABELAS_SO_LOG:
+        for evento, ref, op in (('INSERT', 'NEW', 'I'), ('UPDATE', 'NEW', 'U'), ('DELETE', 'OLD', 'D')):
+            c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{t}_log_{op.lower()} AFTER {evento} ON {t}
+                          BEGIN
+                              DELETE FROM log_alteracoes WHERE tabela = '{t}' AND linha_id = {ref}.rowid;
+                              INSERT INTO log_alteracoes (tabela, linha_id, operacao)
+                              VALUES ('{t}', {ref}.rowid, '{op}');
+                          END""")
+
+
+# --- EXECUÇÃO ---
+# (versão, descrição, função) — só acrescentar no fim; uma migração aplicada nunca é editada.
+MIGRACOES = [
+    (1, "tabelas base e valores iniciais", _esquema_base),
+    (2, "índices do Kanban", _indices_kanban),
+    (3, "log de alterações e versão por linha", _criar_rastreamento),
+    (4, "resumo materializado por lote/status", _criar_resumo_lotes),
+    (5, "índice de busca FTS5", _criar_busca),
+    (6, "chaves estrangeiras de responsável e índices de lote/frota", _chaves_estrangeiras),
+    (7, "datas em texto ISO e índices de prazo em aberto", _datas_iso),
+    (8, "fila de trabalhos em segundo plano", _criar_trabalhos),
+    (9, "busca reindexa só quando mudam as colunas indexadas", _busca_so_colunas_indexadas),
+    (10, "histórico de status/progresso e agregados de ciclo e fluxo", _criar_historico),
+    (11, "reabrir item desfaz a saída no fluxo em vez de somar entrada", _reabrir_desfaz_saida),
+    (12, "log de alterações de gestores e status_config", _log_cadastros),
+]
+VERSAO_ESQUEMA = MIGRACOES[-1][0]
+
+
+def versao_banco(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(caminho=None):
+    # Conexão própria, fora do pool: PRAGMA foreign_keys só muda fora de transação e precisa
+    # ficar desligado enquanto as tabelas são recriadas. Cada migração roda no seu BEGIN IMMEDIATE
+    # e a versão é relida dentro dele, então dois processos subindo juntos não aplicam a mesma duas vezes.
+    conn = db._abrir_conexao(caminho or db.DB_PATH)
+    aplicadas = []
+    try:
+        conn.execute("PRAGMA foreign_keys=OFF")
+        for versao, descricao, func in MIGRACOES:
+            if versao_banco(conn) >= versao:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if versao_banco(conn) < versao:
+                    func(conn)
+                    conn.execute(f"PRAGMA user_version={versao}")
+                    aplicadas.append((versao, descricao))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    finally:
+        conn.close()
+    if aplicadas:
+        db.marcar_alteradas('reformas', 'pendencias', 'gestores', 'status_config')
+    return aplicadas
+
+
+_pronto = False
+_pronto_lock = threading.Lock()
+
+
+def garantir_esquema():
+    global _pronto
+    if _pronto:
+        return
+    with _pronto_lock:
+        if not _pronto:
+            migrar()
+            _pronto = True
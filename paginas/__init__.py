@@ -0,0 +1,47 @@
+import importlib
+import os
+import sys
+from functools import cache
+
+import streamlit as st
+
+import instrumentacao as instr
+
+# --- PÁGINAS ---
+# Cada página do menu é um módulo deste pacote com mostrar(). O módulo (e o que só ele usa: painel
+# e plotly.express, previsão, histórico, edição...) é importado na primeira vez que a página é
+# aberta no processo, não na subida do app.py. ?pagina=<módulo> na URL escolhe a página inicial.
+PAGINAS = {
+    "📊 Painel TV": 'dashboard',
+    "📋 Kanban (Pendências)": 'pendencias',
+    "📝 Cadastro Lotes": 'lotes',
+    "👥 Gestores": 'equipe',
+    "🛠️ Diário de Bordo": 'diario',
+    "⏱️ Desempenho": 'desempenho',  # só com ?admin=<REFORMA_ADMIN>
+}
+SO_ADMIN = ('desempenho',)
+
+# --- ARQUIVOS ESTÁTICOS ---
+# static/ é servida pelo Streamlit em app/static/ (.streamlit/config.toml, enableStaticServing)
+PASTA_STATIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+LOGO = "app/static/logo.png"
+
+
+@cache
+def _css(nome):
+    with open(os.path.join(PASTA_STATIC, nome), encoding='utf-8') as f:
+        return f.read()
+
+
+def estilo(nome):
+    # CSS de static/, lido uma vez por processo
+    st.markdown(f"<style>{_css(nome)}</style>", unsafe_allow_html=True)
+
+
+def abrir(nome):
+    # Importa a página na primeira vez (medida como 'importacao' com a instrumentação ligada) e a desenha
+    modulo = f"paginas.{nome}"
+    if modulo not in sys.modules:
+        with instr.trecho('importacao', modulo):
+            importlib.import_module(modulo)
+    sys.modules[modulo].mostrar()
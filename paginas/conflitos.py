@@ -0,0 +1,37 @@
+import streamlit as st
+
+from edicao import Conflito, atualizar_campos
+
+# --- CONFLITOS DE EDIÇÃO ---
+# Ver edicao.py: a escrita leva a versão vista na tela. Se outra pessoa gravou os mesmos campos antes,
+# nada é gravado e o conflito fica na sessão (chave) até o usuário escolher como resolver.
+def salvar_edicao(chave, tabela, id_linha, visto, novos):
+    try:
+        atualizar_campos(tabela, id_linha, visto, novos)
+    except Conflito as e:
+        st.session_state[chave] = e
+        return False
+    return True
+
+
+def resolver_conflito(chave, escopo="app", limpar=()):
+    # escopo="fragment" dentro de um st.dialog, para um novo conflito reaparecer no mesmo diálogo;
+    # limpar: chaves da sessão com o snapshot da tela, descartadas depois de resolver
+    erro = st.session_state[chave]
+    escolha = None
+    if erro.atual is None:
+        st.error("Registro excluído por outra pessoa enquanto você editava.")
+        if st.button("Ok", key=f"{chave}_ok"): escolha = {}
+    else:
+        st.warning("Outra pessoa alterou este registro enquanto você editava. Nada foi gravado ainda.")
+        st.dataframe(erro.quadro(), use_container_width=True, hide_index=True)
+        c1, c2, c3 = st.columns(3)
+        if c1.button("Manter os meus", key=f"{chave}_meus", type="primary"): escolha = erro.meus
+        if c2.button("Só os sem conflito", key=f"{chave}_mesclar"):
+            escolha = {c: v for c, v in erro.meus.items() if c not in erro.campos}
+        if c3.button("Ficar com os atuais", key=f"{chave}_atuais"): escolha = {}
+    if escolha is not None:
+        del st.session_state[chave]
+        for k in limpar: st.session_state.pop(k, None)
+        if escolha: salvar_edicao(chave, erro.tabela, erro.id_linha, erro.atual, escolha)
+        st.rerun(scope=escopo if chave in st.session_state else "app")
@@ -0,0 +1,105 @@
+import streamlit as st
+from datetime import date
+
+from dados import carregar_cores_status, carregar_resumo_lotes, kpis_lotes
+from db import versoes
+from historico import burndown, ciclo_por_gestor, ciclo_por_lote, tempo_em_status, vazao_semanal
+import instrumentacao as instr
+from painel import MAQUINAS_POR_PAGINA, MODOS, escolher_modo, fatia_pagina, figura_agregada, figura_lote, paginas_tv
+from prazos import contar_prazos, maquinas_atrasadas
+from previsao import previsao_lotes, resumo_risco
+from sincronia import espelho
+
+# --- ABA 1: DASHBOARD ---
+def mostrar():
+    hoje_iso = date.today().isoformat()
+    c_tit, c_tv = st.columns([5, 1])
+    c_tit.title("🚜 Painel de Gestão à Vista")
+    c_tv.link_button("📺 Modo TV", "?tv=1", use_container_width=True)
+    resumo = carregar_resumo_lotes();
+    cores = carregar_cores_status()
+    if not resumo.empty:
+        lotes = resumo['lote'].unique();
+        c_f, c_k = st.columns([1, 4])
+        with c_f:
+            fl = st.multiselect("Lotes:", lotes, default=lotes)
+        if fl:
+            with c_k:
+                k = kpis_lotes(resumo, fl)
+                c1, c2, c3, c4 = st.columns(4)
+                c1.metric("Total", k['total'])
+                c2.metric("Prontas", k['prontas'])
+                c3.metric("Pendentes", k['pendentes'])
+                c4.metric("Andamento", f"{k['andamento']:.0f}%")
+                pz = contar_prazos(hoje_iso)
+                c5, c6, c7, c8 = st.columns(4)
+                c5.metric("🔥 Tarefas atrasadas", pz['atrasada'])
+                c6.metric("⚠️ Vencem hoje", pz['hoje'])
+                c7.metric("📅 Próximos 7 dias", pz['semana'])
+                c8.metric("🚜 Máquinas atrasadas", len(maquinas_atrasadas(hoje_iso, tuple(fl))))
+            prev = previsao_lotes(hoje_iso)
+            risco = resumo_risco(prev, fl)
+            if risco: st.warning(f"🔮 Lotes com término previsto fora do prazo: {risco}")
+            with st.expander("🔮 Previsão de término por lote"):
+                st.caption("Velocidade de cada máquina pelo progresso recente (ou desde o início); o lote termina com a "
+                           "última máquina. Máquinas sem nenhum avanço ficam sem estimativa.")
+                st.dataframe(prev[prev['lote'].isin(fl)], use_container_width=True, hide_index=True,
+                             column_config={"termino_previsto": st.column_config.DateColumn("Término previsto"),
+                                            "data_previsao": st.column_config.DateColumn("Previsão cadastrada")})
+            st.markdown("---")
+            c_m, c_pg = st.columns([4, 1])
+            modo_sel = c_m.radio("Visualização:", MODOS, horizontal=True, key="modo_painel")
+            modo = escolher_modo(k['total'], len(fl), modo_sel)
+            if modo_sel == "Automático":
+                c_m.caption(f"{modo}: {k['total']} máquinas em {len(fl)} lotes")
+            if modo != "Detalhado":
+                # Agregado lote x status: tamanho da figura não depende do número de máquinas
+                fig = figura_agregada(tuple(sorted(fl, key=str)), modo)
+                with instr.trecho('render', 'st.plotly_chart'):
+                    st.plotly_chart(fig, use_container_width=True)
+            else:
+                esp = espelho('reformas', 'lote')
+                df = esp.atualizar()
+                df_v = df[df['lote'].isin(fl)]
+                paginas = paginas_tv(df_v.groupby('lote').size().sort_index(key=lambda i: i.astype(str)).to_dict(),
+                                     MAQUINAS_POR_PAGINA)
+                pag = 0
+                if len(paginas) > 1:
+                    pag = c_pg.number_input(f"Página (de {len(paginas)})", 1, len(paginas), 1, key="pag_painel") - 1
+                # Figuras por lote/parte guardadas na sessão: só os lotes com alteração no delta são redesenhados
+                figs = st.session_state.setdefault('figs_painel', {})
+                v_cores = versoes('status_config')
+                for lote, parte, n_partes in (paginas[pag] if paginas else []):
+                    chave = (esp.versao_grupo.get(lote, 0), v_cores)
+                    if figs.get((lote, parte), (None,))[0] != chave:
+                        try:
+                            df_l = fatia_pagina(df_v[df_v['lote'] == lote], parte, MAQUINAS_POR_PAGINA)
+                            titulo = f"{lote} ({parte + 1}/{n_partes})" if n_partes > 1 else lote
+                            figs[(lote, parte)] = (chave, figura_lote(df_l, titulo, cores))
+                        except:
+                            st.error("Erro gráfico")
+                            continue
+                    with instr.trecho('render', 'st.plotly_chart'):
+                        st.plotly_chart(figs[(lote, parte)][1], use_container_width=True)
+                for chave_fig in [c for c in figs if c[0] not in set(lotes)]:
+                    del figs[chave_fig]
+            with st.expander("📈 Vazão, ciclo e burndown"):
+                lotes_txt = tuple(sorted(str(l) for l in fl if l is not None))
+                h1, h2, h3, h4 = st.tabs(["Burndown", "Vazão semanal", "Ciclo por lote/gestor", "Tempo em cada status"])
+                with h1:
+                    bd = burndown(lotes_txt)
+                    if bd.empty: st.caption("Sem movimentação registrada para estes lotes.")
+                    else: st.line_chart(bd.pivot(index='dia', columns='lote', values='em_aberto').ffill())
+                with h2:
+                    vz = vazao_semanal(lotes=lotes_txt)
+                    if vz.empty: st.caption("Nenhuma máquina concluída desde o início do histórico.")
+                    else: st.bar_chart(vz.set_index('semana')['finalizadas'])
+                with h3:
+                    cl, cg = st.columns(2)
+                    cpl = ciclo_por_lote()
+                    cl.dataframe(cpl[cpl['lote'].isin(lotes_txt)], use_container_width=True, hide_index=True)
+                    cg.dataframe(ciclo_por_gestor(), use_container_width=True, hide_index=True)
+                with h4:
+                    st.dataframe(tempo_em_status(), use_container_width=True, hide_index=True)
+    else:
+        st.info("Vazio")
@@ -0,0 +1,44 @@
+import streamlit as st
+import pandas as pd
+
+import instrumentacao as instr
+
+# --- DESEMPENHO (ADMIN) ---
+def mostrar():
+    st.header("Desempenho")
+    c_l, c_z = st.columns([3, 1])
+    st.session_state['instr_ligada'] = instr.ligada()
+    c_l.toggle("Medir reruns, consultas e exportações (processo inteiro)", key='instr_ligada',
+               on_change=lambda: instr.ligar(st.session_state['instr_ligada']))
+    if c_z.button("Zerar medidas"):
+        instr.zerar()
+        for k in ('instr_sessao', 'instr_reruns', 'instr_ultimo'): st.session_state.pop(k, None)
+        st.rerun()
+    if instr.ARQUIVO_LOG: st.caption(f"Log JSON: {instr.ARQUIVO_LOG}")
+    ult = st.session_state.get('instr_ultimo')
+    if ult is None:
+        st.info("Sem medidas: ligue a medição e navegue pelas outras telas.")
+    else:
+        r = ult.resumo()
+        st.subheader(f"Último rerun: {r['rotulo']} ({r['inicio']})")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Tempo total", f"{r['segundos'] * 1000:.0f} ms")
+        c2.metric("Consultas", r['consultas'])
+        c3.metric("Tempo em SQL", f"{r['segundos_sql'] * 1000:.0f} ms")
+        c4.metric("Linhas lidas", r['linhas_sql'])
+        st.dataframe(ult.tabela().sort_values('ms', ascending=False), use_container_width=True, hide_index=True)
+    a_s, a_p = st.tabs(["Esta sessão", "Processo"])
+    with a_s:
+        st.dataframe(pd.DataFrame(list(st.session_state.get('instr_reruns', [])))[::-1], use_container_width=True,
+                     hide_index=True)
+        sess = st.session_state.get('instr_sessao', {})
+        st.markdown("**Consultas mais lentas**")
+        st.dataframe(instr.consultas_lentas(sessao=sess), use_container_width=True, hide_index=True)
+        st.markdown("**Fases mais lentas**")
+        st.dataframe(instr.fases_lentas(sessao=sess), use_container_width=True, hide_index=True)
+    with a_p:
+        st.caption("Todas as sessões e trabalhos em segundo plano deste processo")
+        st.markdown("**Consultas mais lentas**")
+        st.dataframe(instr.consultas_lentas(), use_container_width=True, hide_index=True)
+        st.markdown("**Fases mais lentas**")
+        st.dataframe(instr.fases_lentas(), use_container_width=True, hide_index=True)
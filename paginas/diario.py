@@ -0,0 +1,72 @@
+import sqlite3
+import streamlit as st
+
+from busca import ids_encontrados
+from dados import carregar_cores_status, carregar_gestores, carregar_lotes, carregar_reforma, indice_rotulos_reformas
+from db import executar
+from historico import historico_item
+from paginas.conflitos import resolver_conflito, salvar_edicao
+
+# --- ABA 5: DIÁRIO DE BORDO ---
+def mostrar():
+    st.header("Atualização")
+    with st.expander("⚙️ Config Status"):
+        c1, c2 = st.columns(2)
+        with c1:
+            with st.form("ns"):
+                n = st.text_input("Nome");
+                c = st.color_picker("Cor")
+                if st.form_submit_button("Criar"):
+                    try:
+                        executar("INSERT INTO status_config VALUES (?,?)", (n, c))
+                    except sqlite3.IntegrityError:
+                        st.error(f"Status '{n}' já existe")
+                    else:
+                        st.rerun()
+        with c2:
+            ds = st.selectbox("Excluir:", list(carregar_cores_status().keys()))
+            if st.button("Apagar"): executar("DELETE FROM status_config WHERE nome=?", (ds,)); st.rerun()
+
+    st.divider()
+    le = carregar_lotes();
+    cd = carregar_cores_status()
+    if le:
+        fl = st.selectbox("Lote:", ["Todos"] + le)
+        rot = indice_rotulos_reformas(None if fl == "Todos" else fl)
+        b = st.text_input("Buscar (frota, modelo, obs):");
+        op = [i for i in ids_encontrados(b, 'reformas') if i in rot] if b.strip() else list(rot)
+        atual = carregar_reforma(st.selectbox("Selecione:", op, format_func=rot.get)) if op else None
+        if atual is not None:
+            # O formulário é montado da máquina como estava ao abrir (guardada na sessão): salvar grava só
+            # os campos alterados, com a versão vista na cláusula WHERE (edicao.py)
+            if st.session_state.get('diario_visto', {}).get('id') != atual['id']:
+                st.session_state['diario_visto'] = atual.to_dict()
+            d = st.session_state['diario_visto']
+            chave = f"conflito_reforma_{d['id']}"
+            st.info(f"**{d['frota']}** ({d['responsavel']})")
+            if chave in st.session_state:
+                resolver_conflito(chave, limpar=('diario_visto',))
+            elif d['versao'] != atual['versao']:
+                c_av, c_rc = st.columns([4, 1])
+                c_av.warning("Esta máquina foi alterada por outra pessoa depois que você a abriu.")
+                if c_rc.button("🔄 Recarregar"): st.session_state['diario_visto'] = atual.to_dict(); st.rerun()
+            with st.form("up"):
+                c1, c2 = st.columns(2)
+                ls = list(cd.keys());
+                ix = ls.index(d['status']) if d['status'] in ls else 0
+                ns = c1.selectbox("Status", ls, index=ix);
+                np = c2.slider("%", 0, 100, int(d['progresso']))
+                no = st.text_area("Obs", value=d['observacao'] or "")
+                dg = carregar_gestores();
+                lg = dg['nome'].tolist();
+                ir = lg.index(d['responsavel']) if d['responsavel'] in lg else 0
+                nr = st.selectbox("Resp:", lg, index=ir)
+                if st.form_submit_button("Salvar", type="primary"):
+                    if salvar_edicao(chave, 'reformas', d['id'], d,
+                                     {'status': ns, 'progresso': np, 'observacao': no, 'responsavel': nr}):
+                        st.session_state.pop('diario_visto', None)
+                    st.rerun()
+            with st.expander("🕓 Histórico da máquina"):
+                st.dataframe(historico_item(int(d['id'])), use_container_width=True, hide_index=True)
+        else:
+            st.warning("Nada encontrado")
@@ -0,0 +1,16 @@
+import streamlit as st
+
+from cadastro import salvar_gestores
+from dados import carregar_gestores
+
+# --- ABA 4: GESTORES ---
+def mostrar():
+    st.header("Equipe")
+    if 'msg_gestores' in st.session_state: st.success(st.session_state.pop('msg_gestores'))
+    base = carregar_gestores()
+    ed = st.data_editor(base, num_rows="dynamic", use_container_width=True, hide_index=True)
+    if st.button("Salvar"):
+        res = salvar_gestores(base, ed)
+        st.session_state['msg_gestores'] = (f"Ok: {res['inseridas']} incluídos, {res['alteradas']} alterados, "
+                                            f"{res['removidas']} removidos")
+        st.rerun()
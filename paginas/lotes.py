@@ -0,0 +1,104 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+
+from cadastro import inserir_lote, ler_planilha, remover_frotas
+from dados import carregar_dados, carregar_gestores, carregar_lotes
+from db import executar
+from edicao import atualizar_em_massa
+
+# --- ABA 3: CADASTRO ---
+def mostrar():
+    st.header("Cadastro")
+    a1, a2 = st.tabs(["📂 Lote Massa", "✏️ Manutenção"])
+    dfg = carregar_gestores();
+    lg = dfg['nome'].tolist() if not dfg.empty else []
+    with a1:
+        if 'msg_lote' in st.session_state: st.success(st.session_state.pop('msg_lote'))
+        with st.form("nl"):
+            c1, c2, c3 = st.columns(3)
+            nl = c1.text_input("Lote");
+            rl = c2.selectbox("Resp", lg) if lg else None;
+            dp = c3.date_input("Prev")
+            grid = st.data_editor(pd.DataFrame([{"Frota": "", "Modelo": "", "Obs": ""}]), num_rows="dynamic",
+                                  use_container_width=True)
+            arq = st.file_uploader("Ou importe uma planilha (colunas Frota, Modelo, Obs)", type=["csv", "xlsx"])
+            if st.form_submit_button("Salvar", type="primary"):
+                if nl and rl:
+                    try:
+                        dados_lote = pd.concat([grid, ler_planilha(arq)], ignore_index=True) if arq else grid
+                        res = inserir_lote(nl, rl, dp, dados_lote)
+                    except Exception as e:
+                        st.error(f"Erro na importação: {e}")
+                    else:
+                        msg = f"{res['inseridas']} Salvos! ({res['linhas_por_s']:.0f} linhas/s em {res['segundos']:.2f}s)"
+                        if res['ja_no_lote']: msg += f" | Já no lote, ignoradas: {', '.join(res['ja_no_lote'][:20])}"
+                        if res['repetidas_planilha']: msg += f" | Repetidas na planilha: {res['repetidas_planilha']}"
+                        if res['em_outros_lotes']: msg += f" | Também em outros lotes: {', '.join(res['em_outros_lotes'][:20])}"
+                        st.session_state['msg_lote'] = msg
+                        st.rerun()
+                else:
+                    st.error("Erro")
+    with a2:
+        le = carregar_lotes()
+        if le:
+            ls = st.selectbox("Lote:", le)
+            dfr = carregar_dados();
+            dl = dfr[dfr['lote'] == ls]
+            if not dl.empty:
+                st.info(f"Resp: {dl.iloc[0]['responsavel']}")
+                # Versão e responsável de cada máquina como estavam na tela (rerun anterior): as trocas em
+                # massa só gravam nas que ninguém alterou desde então (edicao.atualizar_em_massa)
+                agora = {int(i): (int(v), r) for i, v, r in dl[['id', 'versao', 'responsavel']].itertuples(index=False)}
+                ant = st.session_state.get('vistos_lote')
+                vistos = {**agora, **ant[1]} if ant and ant[0] == ls else agora
+                st.session_state['vistos_lote'] = (ls, agora)
+
+
+                def trocar_responsavel(novo, vistos_ids):
+                    gravadas, conflito = atualizar_em_massa('reformas', 'responsavel', novo, vistos_ids)
+                    st.session_state['msg_manut'] = f"{gravadas} máquina(s) passaram para {novo}"
+                    if conflito: st.session_state['conflito_lote'] = (novo, conflito)
+                    st.rerun()
+
+
+                if 'msg_manut' in st.session_state: st.success(st.session_state.pop('msg_manut'))
+                if 'conflito_lote' in st.session_state:
+                    novo, ids_c = st.session_state['conflito_lote']
+                    fr_c = dfr[dfr['id'].isin(ids_c)]
+                    st.warning(f"{len(ids_c)} máquina(s) ficaram sem trocar para {novo}: outra pessoa mudou o "
+                               f"responsável depois que a tela foi aberta ({', '.join(fr_c['frota'].astype(str)[:20])}).")
+                    c1, c2 = st.columns(2)
+                    if c1.button("Trocar nelas também"):
+                        del st.session_state['conflito_lote']
+                        trocar_responsavel(novo, {int(i): (int(v), r) for i, v, r in
+                                                  fr_c[['id', 'versao', 'responsavel']].itertuples(index=False)})
+                    if c2.button("Manter como estão"): del st.session_state['conflito_lote']; st.rerun()
+                with st.expander("Dividir Lote"):
+                    c1, c2 = st.columns([2, 1]);
+                    mm = c1.multiselect("Frotas:", dl['frota'].unique());
+                    ng = c1.selectbox("Novo:", lg, key="n")
+                    if c2.button("Aplicar"): trocar_responsavel(ng, {i: vistos[i] for i in dl[dl['frota'].isin(mm)]['id']})
+                with st.expander("Trocar Tudo"):
+                    nt = st.selectbox("Novo:", lg, key="nt")
+                    if st.button("Trocar"): trocar_responsavel(nt, {i: vistos[i] for i in dl['id']})
+                st.divider()
+                c_a, c_r = st.columns(2)
+                with c_a:
+                    with st.form("ad"):
+                        fn = st.text_input("F");
+                        mn = st.text_input("M")
+                        if st.form_submit_button("Add"):
+                            rd = pd.to_datetime(dl.iloc[0]['data_previsao']).date()
+                            executar(
+                                "INSERT INTO reformas (lote, frota, modelo, responsavel, data_inicio, data_previsao, status, progresso, observacao) VALUES (?,?,?,?,?,?,'Aguardando',0,'')",
+                                (ls, fn, mn, dl.iloc[0]['responsavel'], date.today(), rd));
+                            st.success("Ok");
+                            st.rerun()
+                with c_r:
+                    dm = st.multiselect("Remover:", dl['frota'].unique())
+                    if st.button("Excluir"): remover_frotas(ls, dm); st.rerun()
+            else:
+                st.warning("Vazio")
+        else:
+            st.warning("Sem lotes")
@@ -0,0 +1,134 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+
+from busca import ids_encontrados
+from dados import FEITOS_POR_PAGINA, carregar_dados, carregar_gestores, carregar_pagina_feitos, carregar_pendencias_status
+from db import executar
+import instrumentacao as instr
+from kanban import html_coluna, rotulos_cartoes
+from paginas import estilo
+from paginas.conflitos import resolver_conflito, salvar_edicao
+from prazos import contar_prazos
+
+# --- MODAL EDIÇÃO ---
+@st.dialog("✏️ Editar Pendência")
+def editar_pendencia_modal(id_p, dados_atuais):
+    # dados_atuais: a linha como estava no Kanban ao abrir (com versao); grava só os campos alterados
+    chave = f"conflito_pendencia_{id_p}"
+    if chave in st.session_state:
+        resolver_conflito(chave, "fragment"); return
+    with st.form("edit_form"):
+        c1, c2 = st.columns([3, 2])
+        nt = c1.text_input("Título", value=dados_atuais['titulo'])
+        lg = carregar_gestores()['nome'].tolist();
+        idx_r = lg.index(dados_atuais['responsavel']) if dados_atuais['responsavel'] in lg else 0
+        nr = c2.selectbox("Responsável", lg, index=idx_r)
+        nd = st.text_area("Descrição", value=dados_atuais['descricao'])
+        dv = pd.to_datetime(dados_atuais['data_prazo']).date() if pd.notna(dados_atuais['data_prazo']) and dados_atuais['data_prazo'] else None
+        npz = st.date_input("Prazo", value=dv)
+        c3, c4 = st.columns(2)
+        pl = ["Alta", "Média", "Baixa"];
+        idx_p = pl.index(dados_atuais['prioridade']) if dados_atuais['prioridade'] in pl else 1
+        npr = c3.selectbox("Prioridade", pl, index=idx_p)
+        sl = ["A Fazer", "Fazendo", "Feito"];
+        idx_s = sl.index(dados_atuais['status']) if dados_atuais['status'] in sl else 0
+        nst = c4.selectbox("Mover para:", sl, index=idx_s)
+        if st.form_submit_button("Salvar", type="primary"):
+            novos = {'titulo': nt, 'descricao': nd, 'responsavel': nr, 'prioridade': npr, 'status': nst,
+                     'data_prazo': npz}
+            if salvar_edicao(chave, 'pendencias', id_p, dados_atuais, novos): st.rerun()
+            else: st.rerun(scope="fragment")
+
+
+# --- ABA 2: KANBAN ---
+def mostrar():
+    hoje_iso = date.today().isoformat()
+    estilo('kanban.css')
+    c_head, c_btn = st.columns([4, 1])
+    c_head.title("Quadro de Tarefas")
+    with c_btn:
+        st.write("")
+        with st.popover("➕ Nova Tarefa", use_container_width=True):
+            with st.form("np"):
+                tt = st.text_input("Título");
+                td = st.text_area("Descrição");
+                dt = st.date_input("Prazo", value=None)
+                lm = ["- Geral -"] + carregar_dados()['frota'].unique().tolist()
+                tv = st.selectbox("Vincular Frota", lm)
+                tr = st.selectbox("Resp.", carregar_gestores()['nome'].tolist())
+                tp = st.selectbox("Prioridade", ["Alta", "Média", "Baixa"])
+                if st.form_submit_button("Criar", type="primary"):
+                    v = tv if tv != "- Geral -" else None
+                    executar(
+                        "INSERT INTO pendencias (titulo, descricao, responsavel, frota_vinculada, prioridade, status, data_criacao, data_prazo) VALUES (?,?,?,?,?, 'A Fazer', ?, ?)",
+                        (tt, td, tr, v, tp, date.today(), dt))
+                    st.success("Ok");
+                    st.rerun()
+
+    gestores = carregar_gestores()['nome'].tolist()
+    c_fg, c_fb, c_fp, c_fs = st.columns([3, 2, 1, 1])
+    filtro_g = c_fg.multiselect("👤 Filtrar por Gestor:", gestores, default=gestores)
+    busca_k = c_fb.text_input("🔎 Buscar (título, descrição, frota):")
+    filtro_p = c_fp.multiselect("Prioridade:", ["Alta", "Média", "Baixa"])
+    filtro_s = c_fs.multiselect("Colunas:", ["A Fazer", "Fazendo", "Feito"], default=["A Fazer", "Fazendo", "Feito"])
+    fg, fp = tuple(filtro_g), tuple(filtro_p)
+    fi = ids_encontrados(busca_k, 'pendencias') if busca_k.strip() else None
+    # Cursores das páginas de "Feito" já abertas; muda o filtro, volta para a primeira página
+    if st.session_state.get('feitos_filtro') != (fg, fp, fi):
+        st.session_state['feitos_filtro'] = (fg, fp, fi)
+        st.session_state['feitos_cursores'] = [None]
+
+    pz = contar_prazos(hoje_iso, fg)
+    if pz['atrasada'] or pz['hoje']:
+        st.warning(f"🔥 {pz['atrasada']} atrasada(s) | ⚠️ {pz['hoje']} vencem hoje | 📅 {pz['semana']} nos próximos 7 dias")
+
+    if 'msg_kanban' in st.session_state: st.warning(st.session_state.pop('msg_kanban'))
+    st.divider()
+    c_td, c_dg, c_dn = st.columns(3)
+    acoes = {"todo": [("▶️", "Fazendo")], "doing": [("⏪", "A Fazer"), ("✅", "Feito")],
+             "done": [("⏪", "Fazendo"), ("🗑️", None)]}
+    status_coluna = {"todo": "A Fazer", "doing": "Fazendo", "done": "Feito"}
+
+
+    @instr.medir('render', 'Kanban: render_coluna')
+    def render_coluna(df, col_type):
+        if df.empty: return
+        # Ações leves: um seletor de cartão e os botões da coluna, em vez de quatro botões por cartão
+        rot = rotulos_cartoes(df)
+        sel = st.selectbox("Tarefa", list(rot), format_func=rot.get, key=f"sel_{col_type}",
+                           label_visibility="collapsed")
+        bts = st.columns(3)
+        if bts[0].button("✏️", key=f"e_{col_type}"): editar_pendencia_modal(sel, df[df['id'] == sel].iloc[0])
+        for b, (icone, destino) in zip(bts[1:], acoes[col_type]):
+            if b.button(icone, key=f"{col_type}_{destino or 'excluir'}"):
+                deletar_pendencia(sel) if destino is None else mudar_status(sel, status_coluna[col_type], destino)
+        st.markdown(html_coluna(df), unsafe_allow_html=True)
+
+
+    def mudar_status(id, de, stt):
+        # Só move se o cartão ainda está na coluna em que foi visto
+        if not executar("UPDATE pendencias SET status=? WHERE id=? AND status=?", (stt, id, de)):
+            st.session_state['msg_kanban'] = "A tarefa já tinha sido movida ou excluída por outra pessoa."
+        st.rerun()
+
+
+    def deletar_pendencia(id):
+        executar("DELETE FROM pendencias WHERE id=?", (id,)); st.rerun()
+
+
+    with c_td:
+        st.header("📌 A Fazer")
+        if "A Fazer" in filtro_s: render_coluna(carregar_pendencias_status("A Fazer", fg, fp, fi, hoje_iso), "todo")
+    with c_dg:
+        st.header("🔨 Fazendo")
+        if "Fazendo" in filtro_s: render_coluna(carregar_pendencias_status("Fazendo", fg, fp, fi, hoje_iso), "doing")
+    with c_dn:
+        st.header("🏁 Feito")
+        if "Feito" in filtro_s:
+            pgs = [carregar_pagina_feitos(fg, fp, c, ids=fi, hoje=hoje_iso) for c in st.session_state['feitos_cursores']]
+            render_coluna(pd.concat(pgs, ignore_index=True), "done")
+            if len(pgs[-1]) == FEITOS_POR_PAGINA:
+                if st.button("⬇️ Carregar mais", use_container_width=True):
+                    st.session_state['feitos_cursores'].append(int(pgs[-1]['id'].iloc[-1]))
+                    st.rerun()
@@ -0,0 +1,78 @@
+import streamlit as st
+from datetime import date, datetime
+
+from dados import carregar_cores_status, carregar_resumo_lotes, kpis_lotes
+from db import versoes
+import instrumentacao as instr
+from painel import MAQUINAS_POR_TELA, POLL_S, ROTACAO_S, fatia_pagina, figura_lote, pagina_do_relogio, paginas_tv
+from prazos import contar_prazos
+from previsao import previsao_lotes, resumo_risco
+from sincronia import espelho
+
+# --- MODO TV (QUIOSQUE) ---
+# ?tv=1 na URL abre só o painel, sem sidebar nem menus (?lotes=A,B&rotacao=20&maquinas=24 opcionais).
+# O painel é desenhado uma vez; um fragmento pequeno consulta a versão dos dados a cada POLL_S e só
+# pede um novo rerun quando a versão (reformas, status, pendências), o dia ou a página da rotação
+# mudam. Com a oficina parada cada TV custa uma consulta de max(seq) a cada poucos segundos.
+def _param_inteiro(nome, padrao):
+    # Parâmetro numérico da URL do quiosque: inválido volta ao padrão, e nunca abaixo de 1
+    try:
+        return max(1, int(st.query_params.get(nome, padrao)))
+    except ValueError:
+        return padrao
+
+
+def desenhar_tv():
+    hoje_iso = date.today().isoformat()
+    qp = st.query_params
+    rotacao, max_maq = _param_inteiro('rotacao', ROTACAO_S), _param_inteiro('maquinas', MAQUINAS_POR_TELA)
+    esp = espelho('reformas', 'lote')
+    df = esp.atualizar()
+    sel = [l for l in qp.get('lotes', '').split(',') if l]
+    df_v = df[df['lote'].isin(sel)] if sel else df
+    cores, v_cores = carregar_cores_status(), versoes('status_config')
+    paginas = paginas_tv(df_v.groupby('lote').size().sort_index(key=lambda i: i.astype(str)).to_dict(), max_maq)
+    pag = pagina_do_relogio(len(paginas), rotacao)
+    # pendências e a data entram por causa dos cartões de prazo (contar_prazos de hoje)
+    st.session_state['tv_desenhado'] = (esp.versao, v_cores, versoes('pendencias'), hoje_iso, pag, len(paginas), rotacao)
+
+    st.markdown("""<style>[data-testid="stSidebar"], [data-testid="stSidebarCollapsedControl"], header
+                   { display: none !important; } .block-container { padding-top: 1rem; }</style>""",
+                unsafe_allow_html=True)
+    c_t, c_p = st.columns([4, 1])
+    c_t.title("🚜 Painel de Gestão à Vista")
+    c_p.caption(f"Página {pag + 1}/{max(len(paginas), 1)} · {datetime.now():%H:%M:%S}")
+    if not paginas:
+        st.info("Vazio"); return
+    k, pz = kpis_lotes(carregar_resumo_lotes(), df_v['lote'].unique()), contar_prazos(hoje_iso)
+    for col, (rotulo, valor) in zip(st.columns(6), (
+            ("Total", k['total']), ("Prontas", k['prontas']), ("Pendentes", k['pendentes']),
+            ("Andamento", f"{k['andamento']:.0f}%"), ("🔥 Tarefas atrasadas", pz['atrasada']),
+            ("⚠️ Vencem hoje", pz['hoje']))):
+        col.metric(rotulo, valor)
+    risco = resumo_risco(previsao_lotes(hoje_iso), [l for l, _, _ in paginas[pag]])
+    if risco: st.error(f"🔮 Previsão de atraso: {risco}")
+    figs = st.session_state.setdefault('figs_tv', {})
+    for lote, parte, n_partes in paginas[pag]:
+        chave = (esp.versao_grupo.get(lote, 0), v_cores, max_maq)
+        if figs.get((lote, parte), (None,))[0] != chave:
+            df_l = fatia_pagina(df_v[df_v['lote'] == lote], parte, max_maq)
+            titulo = f"{lote} ({parte + 1}/{n_partes})" if n_partes > 1 else lote
+            figs[(lote, parte)] = (chave, figura_lote(df_l, titulo, cores))
+        with instr.trecho('render', 'st.plotly_chart'):
+            st.plotly_chart(figs[(lote, parte)][1], use_container_width=True)
+
+
+@st.fragment(run_every=POLL_S)
+def vigia_tv():
+    versao, v_cores, v_pend, dia, pag, n_paginas, rotacao = st.session_state['tv_desenhado']
+    esp = espelho('reformas', 'lote')
+    esp.atualizar()
+    if (esp.versao, versoes('status_config'), versoes('pendencias'), date.today().isoformat(),
+            pagina_do_relogio(n_paginas, rotacao)) != (versao, v_cores, v_pend, dia, pag):
+        st.rerun()
+
+
+def mostrar():
+    desenhar_tv()
+    vigia_tv()
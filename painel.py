@@ -0,0 +1,115 @@
+import math
+import time
+
+import plotly.express as px
+
+from cache import cache_por_versao
+from instrumentacao import medir
+
+# --- GRÁFICOS DO PAINEL ---
+@medir('render')
+def figura_lote(df_l, lote, cores):
+    df_l = df_l.assign(rotulo=df_l['frota'].fillna('') + " (" + df_l['responsavel'].fillna('') + ")").sort_values(by='progresso')
+    fig = px.bar(df_l, y='rotulo', x='progresso', color='status', text='progresso', orientation='h',
+                 color_discrete_map=cores, height=150 + (len(df_l) * 50))
+    fig.update_layout(title=dict(text=str(lote), font=dict(size=22, color="black")), xaxis_range=[0, 120],
+                      yaxis_title=None, font=dict(size=18, color="black"), margin=dict(l=220),
+                      legend=dict(orientation="h", y=1.01), paper_bgcolor='rgba(0,0,0,0)',
+                      plot_bgcolor='rgba(0,0,0,0)')
+    fig.update_traces(texttemplate='%{text}%', textposition='outside', textfont_size=20,
+                      textfont_weight="bold", textfont_color="black")
+    fig.update_yaxes(showticklabels=True, tickfont=dict(size=18, color="black"))
+    return fig
+
+
+# --- MODO TV: PÁGINAS E ROTAÇÃO ---
+# Cada tela recebe lotes inteiros até MAQUINAS_POR_TELA barras; lote maior que isso é quebrado
+# em partes. A página atual sai do relógio, então todas as TVs mostram a mesma página.
+MAQUINAS_POR_TELA = 24
+ROTACAO_S = 20  # tempo de cada página na tela
+POLL_S = 5  # intervalo da consulta de versão
+
+
+def paginas_tv(contagens, max_maquinas=MAQUINAS_POR_TELA):
+    # contagens: {lote: nº de máquinas}, na ordem de exibição -> [[(lote, parte, n_partes), ...], ...]
+    paginas, atual, ocupadas = [], [], 0
+    for lote, n in contagens.items():
+        partes = max(1, math.ceil(n / max_maquinas))
+        for parte in range(partes):
+            tam = min(max_maquinas, n - parte * max_maquinas)
+            if atual and ocupadas + tam > max_maquinas:
+                paginas.append(atual)
+                atual, ocupadas = [], 0
+            atual.append((lote, parte, partes))
+            ocupadas += tam
+    if atual:
+        paginas.append(atual)
+    return paginas
+
+
+def pagina_do_relogio(n_paginas, rotacao_s=ROTACAO_S, agora=None):
+    return int((agora or time.time()) // rotacao_s) % n_paginas if n_paginas else 0
+
+
+def fatia_pagina(df_l, parte, max_maquinas=MAQUINAS_POR_TELA):
+    # Mesma ordem do gráfico (progresso), para as partes não repetirem máquina
+    return df_l.sort_values('progresso', kind='stable').iloc[parte * max_maquinas:(parte + 1) * max_maquinas]
+
+
+# --- MODOS DO PAINEL PARA MUITAS MÁQUINAS ---
+# Detalhado: uma barra por máquina, com as figuras por lote paginadas (MAQUINAS_POR_PAGINA barras).
+# Resumo: barras empilhadas lote x status a partir do resumo materializado (uma linha por par).
+# Mapa de calor: lote x status quando nem o resumo cabe. O tamanho do JSON enviado ao navegador
+# deixa de crescer com o número de máquinas (ver benchmarks/bench_painel.py).
+MODOS = ("Automático", "Detalhado", "Resumo", "Mapa de calor")
+LIMITE_DETALHADO = 300  # máquinas na seleção
+LIMITE_RESUMO = 40  # lotes na seleção
+MAQUINAS_POR_PAGINA = 60
+
+
+def escolher_modo(n_maquinas, n_lotes, modo="Automático"):
+    if modo != "Automático":
+        return modo
+    if n_maquinas <= LIMITE_DETALHADO:
+        return "Detalhado"
+    return "Resumo" if n_lotes <= LIMITE_RESUMO else "Mapa de calor"
+
+
+def _lote_txt(resumo):
+    return resumo.assign(lote=resumo['lote'].fillna('(sem lote)').astype(str),
+                         status=resumo['status'].replace('', '(sem status)'))
+
+
+@medir('render')
+def figura_resumo(resumo, cores):
+    r = _lote_txt(resumo)
+    media = (r['soma_progresso'] / r['qtd_progresso'].where(r['qtd_progresso'] > 0)).round(0)
+    r = r.assign(media=media.fillna(0))
+    n_lotes = r['lote'].nunique()
+    fig = px.bar(r, y='lote', x='qtd', color='status', orientation='h', text='qtd', color_discrete_map=cores,
+                 hover_data={'media': True}, labels={'qtd': 'Máquinas', 'media': 'Progresso médio'},
+                 height=200 + 32 * n_lotes)
+    fig.update_layout(barmode='stack', yaxis_title=None, yaxis=dict(categoryorder='category descending'),
+                      font=dict(size=16, color="black"), legend=dict(orientation="h", y=1.02),
+                      paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    return fig
+
+
+@medir('render')
+def figura_mapa_calor(resumo):
+    r = _lote_txt(resumo)
+    grade = r.pivot_table(index='lote', columns='status', values='qtd', aggfunc='sum', fill_value=0)
+    fig = px.imshow(grade, text_auto=True, aspect='auto', color_continuous_scale='Blues',
+                    labels=dict(x="Status", y="Lote", color="Máquinas"), height=200 + 14 * len(grade))
+    fig.update_layout(font=dict(size=14, color="black"), paper_bgcolor='rgba(0,0,0,0)')
+    return fig
+
+
+@cache_por_versao('reformas', 'status_config')
+def figura_agregada(lotes, modo):
+    # Figura do modo Resumo/Mapa de calor para a tupla de lotes, guardada até a próxima escrita
+    # em reformas ou status_config (objeto compartilhado: não alterar)
+    from dados import carregar_cores_status, carregar_resumo_lotes
+    resumo = carregar_resumo_lotes()
+    resumo = resumo[resumo['lote'].isin(lotes)]
+    return figura_resumo(resumo, carregar_cores_status()) if modo == "Resumo" else figura_mapa_calor(resumo)
@@ -0,0 +1,72 @@
+from datetime import date
+
+from cache import cache_por_versao
+from db import conexao, ler_sql
+
+# --- PRAZOS CALCULADOS NO SQL ---
+# As datas ficam em texto ISO (AAAA-MM-DD, garantido pelos triggers de migracoes._datas_iso), então
+# comparar strings é comparar datas: atrasadas, vencendo hoje e na semana saem direto do SQL pelos
+# índices parciais de itens em aberto, sem pd.to_datetime linha a linha na hora de desenhar.
+# `hoje` entra na chave do cache: quem chama passa sempre a data (dia_iso()), nunca None.
+DIAS_SEMANA = 7
+# `h` é o (SELECT ? AS hoje) do FROM: a data vai uma vez só nos parâmetros
+COLUNAS_PRAZO = """CASE WHEN p.data_prazo IS NULL THEN '' WHEN p.status = 'Feito' THEN 'feito'
+                        WHEN p.data_prazo < h.hoje THEN 'atrasada' WHEN p.data_prazo = h.hoje THEN 'hoje'
+                        ELSE 'futura' END AS classe_prazo,
+                   ifnull(substr(p.data_prazo, 9, 2) || '/' || substr(p.data_prazo, 6, 2) || '/' ||
+                          substr(p.data_prazo, 1, 4), '') AS prazo_br"""
+JANELAS = {'atrasada': "p.data_prazo < h.hoje",
+           'hoje': "p.data_prazo = h.hoje",
+           'semana': f"p.data_prazo > h.hoje AND p.data_prazo <= date(h.hoje, '+{DIAS_SEMANA} days')"}
+ABERTAS = "p.status <> 'Feito' AND p.data_prazo IS NOT NULL"  # mesmo WHERE de ix_pendencias_prazo_aberto
+
+
+def dia_iso(hoje=None):
+    return hoje if isinstance(hoje, str) else (hoje or date.today()).isoformat()
+
+
+def select_pendencias(where=""):
+    # SELECT de pendencias com classe_prazo e prazo_br; o primeiro parâmetro é a data de hoje
+    return f"SELECT p.*, {COLUNAS_PRAZO} FROM pendencias p, (SELECT ? AS hoje) h {where}"
+
+
+def _responsaveis(responsaveis):
+    if not responsaveis:
+        return "", []
+    return f" AND p.responsavel IN ({','.join('?' * len(responsaveis))})", list(responsaveis)
+
+
+# --- API ---
+@cache_por_versao('pendencias')
+def carregar_pendencias_prazos(hoje):
+    return ler_sql(select_pendencias("ORDER BY p.id"), (dia_iso(hoje),))
+
+
+@cache_por_versao('pendencias')
+def contar_prazos(hoje, responsaveis=()):
+    # {'atrasada': n, 'hoje': n, 'semana': n} das pendências em aberto
+    filtro, params = _responsaveis(responsaveis)
+    somas = ', '.join(f"ifnull(sum({cond}), 0)" for cond in JANELAS.values())
+    with conexao() as conn:
+        linha = conn.execute(f"""SELECT {somas} FROM pendencias p, (SELECT ? AS hoje) h
+                                 WHERE {ABERTAS} AND p.data_prazo <= date(h.hoje, '+{DIAS_SEMANA} days'){filtro}""",
+                             [dia_iso(hoje)] + params).fetchone()
+    return dict(zip(JANELAS, linha))
+
+
+@cache_por_versao('pendencias')
+def pendencias_por_prazo(janela, hoje, responsaveis=()):
+    # Pendências em aberto da janela ('atrasada', 'hoje' ou 'semana'), mais antigas primeiro
+    filtro, params = _responsaveis(responsaveis)
+    return ler_sql(select_pendencias(f"WHERE {ABERTAS} AND {JANELAS[janela]}{filtro} ORDER BY p.data_prazo, p.id"),
+                   [dia_iso(hoje)] + params)
+
+
+@cache_por_versao('reformas')
+def maquinas_atrasadas(hoje, lotes=None):
+    # Máquinas não concluídas com previsão vencida (usa ix_reformas_previsao_aberta)
+    where, params = "", [dia_iso(hoje)]
+    if lotes is not None:
+        where = f" AND lote IN ({','.join('?' * len(lotes))})"; params += list(lotes)
+    return ler_sql(f"""SELECT * FROM reformas WHERE status IS NOT 'Concluído' AND data_previsao IS NOT NULL
+                       AND data_previsao < ?{where} ORDER BY data_previsao, id""", params)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from cache import cache_por_versao
+from dados import carregar_dados
+from db import ler_sql
+from migracoes import CAMPO_PROGRESSO, ENTIDADES, HISTORICO_ORIGENS
+
+# --- PREVISÃO DE TÉRMINO POR VELOCIDADE DE PROGRESSO ---
+# Uma passada vetorizada sobre todas as máquinas: velocidade em %/dia, dias que faltam para 100% e
+# data prevista de término, comparada com data_previsao. A velocidade vem, nesta ordem, do progresso
+# recente (eventos dos últimos JANELA_DIAS, ver historico.py), da média desde data_inicio e da
+# mediana do lote; sem nenhuma das três a máquina fica sem estimativa. O lote termina quando a
+# última máquina termina. Resultado em cache até a próxima escrita em reformas.
+JANELA_DIAS = 14
+MIN_DIAS = 1.0  # intervalo mínimo para uma velocidade valer (evita 30% em 10 minutos = 4000%/dia)
+STATUS_FINAL = HISTORICO_ORIGENS['reformas'][0]
+
+
+def _progresso_recente(hoje):
+    # Por máquina com progresso alterado dentro da janela: progresso no início da janela (último
+    # evento antes dela, ou o `de` do primeiro evento dentro) e o instante desse ponto de partida, em
+    # dias desde a época: o início da janela, ou o primeiro evento da máquina se ela surgiu depois.
+    # Assim todos os saltos dentro da janela contam, inclusive o primeiro
+    return ler_sql(f"""WITH j AS (SELECT CAST(strftime('%s', :hoje, '-{JANELA_DIAS} days') AS INTEGER) AS ini)
+                       SELECT d.linha_id AS id,
+                              coalesce((SELECT a.para FROM eventos a WHERE a.entidade = :e AND a.linha_id = d.linha_id
+                                            AND a.campo = :c AND a.ts < j.ini ORDER BY a.id DESC LIMIT 1),
+                                       d.de, d.para) AS p0,
+                              max(j.ini, (SELECT min(n.ts) FROM eventos n
+                                          WHERE n.entidade = :e AND n.linha_id = d.linha_id)) / 86400.0 AS t0
+                       FROM j, (SELECT linha_id, de, para, row_number() OVER (PARTITION BY linha_id ORDER BY id) AS n
+                                FROM eventos, j WHERE entidade = :e AND campo = :c AND ts >= j.ini) d
+                       WHERE d.n = 1""",
+                   {'hoje': hoje, 'e': ENTIDADES['reformas'], 'c': CAMPO_PROGRESSO})
+
+
+def _dias(col):
+    # Datas ISO -> dias desde a época (float, NaN quando vazia ou inválida)
+    return (pd.to_datetime(col, format='%Y-%m-%d', errors='coerce') - pd.Timestamp(0)).dt.days.to_numpy(float)
+
+
+@cache_por_versao('reformas')
+def previsao_maquinas(hoje):
+    # Uma linha por máquina: velocidade (%/dia), fonte da velocidade, termino_previsto e atraso_dias
+    # (término previsto - data_previsao; positivo = vai atrasar). `hoje` em ISO (faz parte da chave)
+    df = carregar_dados()[['id', 'lote', 'frota', 'responsavel', 'status', 'progresso', 'data_inicio',
+                           'data_previsao']].copy()
+    hoje_n = (pd.Timestamp(hoje) - pd.Timestamp(0)).days
+    prog = df['progresso'].fillna(0).clip(0, 100).to_numpy(float)
+    final = (df['status'] == STATUS_FINAL).to_numpy()
+
+    rec = df[['id']].merge(_progresso_recente(hoje), on='id', how='left')
+    span_rec = hoje_n + 1.0 - rec['t0'].to_numpy(float)  # até o fim do dia de hoje
+    v_rec = np.where(span_rec >= MIN_DIAS, (prog - rec['p0'].to_numpy(float)) / span_rec, np.nan)
+    decorridos = hoje_n - _dias(df['data_inicio'])
+    v_media = np.where(decorridos >= MIN_DIAS, prog / decorridos, np.nan)
+
+    vel = np.where(v_rec > 0, v_rec, np.where(v_media > 0, v_media, np.nan))
+    fonte = np.select([v_rec > 0, v_media > 0], ['recente', 'média'], '')
+    mediana_lote = pd.Series(vel).groupby(df['lote'].fillna('').to_numpy()).transform('median').to_numpy()
+    usa_lote = np.isnan(vel) & ~np.isnan(mediana_lote) & ~final
+    vel = np.where(usa_lote, mediana_lote, vel)
+    fonte = np.where(usa_lote, 'lote', fonte)
+
+    faltam = np.where(prog >= 100, 0.0, np.ceil((100 - prog) / vel))  # NaN sem velocidade
+    termino = np.where(final, np.nan, hoje_n + faltam)  # concluídas não entram no término do lote
+    atraso = termino - _dias(df['data_previsao'])
+
+    df['velocidade'] = np.round(vel, 2)
+    df['fonte'] = np.where(final, 'concluída', np.where(np.isnan(faltam), 'sem dados', fonte))
+    df['termino_previsto'] = pd.to_datetime(termino, unit='D')
+    df['atraso_dias'] = atraso
+    return df
+
+
+@cache_por_versao('reformas')
+def previsao_lotes(hoje):
+    # Uma linha por lote: término previsto (última máquina), previsão cadastrada (a mais tarde do
+    # lote), atraso em dias e em_risco. Máquinas sem estimativa ficam fora do término e são contadas à parte
+    m = previsao_maquinas(hoje)
+    abertas = m['fonte'] != 'concluída'
+    g = m.assign(lote=m['lote'].fillna('(sem lote)'), aberta=abertas, sem_dados=m['fonte'] == 'sem dados',
+                 previsao=pd.to_datetime(m['data_previsao'], format='%Y-%m-%d', errors='coerce'),
+                 atrasando=abertas & (m['atraso_dias'] > 0)).groupby('lote')
+    lotes = pd.DataFrame({'maquinas': g.size(), 'em_aberto': g['aberta'].sum(), 'progresso_medio': g['progresso'].mean(),
+                          'termino_previsto': g['termino_previsto'].max(), 'data_previsao': g['previsao'].max(),
+                          'maquinas_atrasando': g['atrasando'].sum(), 'sem_estimativa': g['sem_dados'].sum()})
+    lotes['atraso_dias'] = (lotes['termino_previsto'] - lotes['data_previsao']).dt.days
+    # em risco: término previsto depois da previsão, ou previsão já vencida com máquina em aberto
+    lotes['em_risco'] = (lotes['em_aberto'] > 0) & ((lotes['atraso_dias'] > 0) | (lotes['data_previsao'] < hoje))
+    lotes['progresso_medio'] = lotes['progresso_medio'].round(1)
+    return lotes.reset_index().sort_values(['em_risco', 'atraso_dias'], ascending=False, ignore_index=True)
+
+
+def resumo_risco(lotes_prev, lotes=None, max_itens=6):
+    # "LOTE A (+12 d), LOTE B (previsão vencida), ..." dos lotes em risco (filtrados por `lotes`)
+    r = lotes_prev[lotes_prev['em_risco']]
+    if lotes is not None:
+        r = r[r['lote'].isin(lotes)]
+    itens = [f"{l} (+{a:.0f} d)" if a == a and a > 0 else f"{l} (previsão vencida)"
+             for l, a in zip(r['lote'], r['atraso_dias'])]
+    return ', '.join(itens[:max_itens]) + (f" e mais {len(itens) - max_itens}" if len(itens) > max_itens else '')
@@ -0,0 +1,182 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from html import escape
+from string import Template
+
+from instrumentacao import medir
+from kanban import classificar_prazos
+
+# --- RELATÓRIO VISUAL (KANBAN) EM HTML ---
+# O relatório é montado num buffer de fragmentos (join no final) e cada cartão renderizado
+# fica em cache por (id, versao da linha, prazo vencido?): numa nova geração só os cartões
+# alterados desde a última são renderizados de novo.
+PAGINA = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>Relatório Visual Kanban - $data</title>
+    <style>
+        @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;700&display=swap');
+
+        body { 
+            font-family: 'Roboto', sans-serif; 
+            background-color: #f4f4f9; 
+            margin: 0; padding: 20px;
+            -webkit-print-color-adjust: exact; 
+            print-color-adjust: exact; 
+        }
+
+        .header { 
+            text-align: center; padding: 15px; 
+            background: #2c3e50; color: white; 
+            border-radius: 8px; margin-bottom: 20px;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        }
+
+        /* Layout Kanban em Colunas */
+        .kanban-board {
+            display: flex;
+            justify-content: space-between;
+            gap: 15px;
+            align-items: flex-start;
+        }
+
+        .coluna {
+            width: 32%;
+            background: #e0e0e0;
+            padding: 10px;
+            border-radius: 8px;
+            min-height: 600px;
+        }
+
+        .col-header {
+            text-align: center;
+            font-weight: bold;
+            font-size: 18px;
+            padding: 10px;
+            background: rgba(0,0,0,0.05);
+            border-radius: 5px;
+            margin-bottom: 15px;
+            border-bottom: 3px solid #aaa;
+            color: #333;
+        }
+
+        .card {
+            background: white;
+            border-radius: 6px;
+            padding: 12px;
+            margin-bottom: 10px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            border: 1px solid #ddd;
+            page-break-inside: avoid;
+        }
+
+        .card-title { font-size: 16px; font-weight: bold; margin-bottom: 5px; color: #000; }
+        .card-desc { font-size: 13px; color: #444; margin-bottom: 8px; line-height: 1.3; }
+
+        .card-footer {
+            display: flex; justify-content: space-between;
+            border-top: 1px solid #eee; padding-top: 5px;
+            font-size: 11px; color: #666; font-weight: bold;
+        }
+
+        /* Cores de Prioridade */
+        .border-Alta { border-left: 6px solid #ff4b4b; }
+        .border-Média { border-left: 6px solid #ffa421; }
+        .border-Baixa { border-left: 6px solid #21c354; }
+
+        /* Cores de Fundo por Status (Para impressão visual) */
+        .bg-fazendo { background-color: #d6eaf8 !important; }
+        .bg-feito { background-color: #d5f5e3 !important; }
+
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h2 style="margin:0">Relatório de Pendências (Kanban)</h2>
+        <p style="margin:5px 0 0 0; font-size:14px">Gerado em: $data</p>
+    </div>
+
+    <div class="kanban-board">
+""")
+
+COLUNA = '<div class="coluna {classe}"><div class="col-header">{status}</div>'
+CARTAO = """
+<div class="card border-{prio}">
+    <div style="display:flex; justify-content:space-between; font-size:10px; color:#666; margin-bottom:4px;">
+        <span>{prio_maiusc}</span>
+        <span>{responsavel}</span>
+    </div>
+    <div class="card-title">{titulo}</div>
+    <div class="card-desc">{descricao}</div>
+    <div class="card-footer">
+        <span>🚜 {frota}</span>
+        {prazo}
+    </div>
+</div>
+"""
+COLUNAS = (("A Fazer", ""), ("Fazendo", "bg-fazendo"), ("Feito", "bg-feito"))
+CACHE_MAX_CARTOES = 20000
+
+
+class CacheFragmentos:
+    def __init__(self, max_itens=CACHE_MAX_CARTOES):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def obter(self, chave, gerar):
+        with self._lock:
+            html = self._itens.get(chave)
+            if html is not None:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return html
+            self.misses += 1
+        html = gerar()
+        with self._lock:
+            self._itens[chave] = html
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+        return html
+
+
+_fragmentos = CacheFragmentos()
+
+
+def _cartao(r, vencido):
+    prazo = ""
+    if r.classe_prazo:
+        prazo = f"<span style='color:{'red' if vencido else 'black'}'>📅 {r.prazo_br[:5]}</span>"
+    prio = r.prioridade or "Baixa"
+    return CARTAO.format(prio=escape(prio), prio_maiusc=escape(prio.upper()), responsavel=escape(str(r.responsavel)),
+                         titulo=escape(str(r.titulo)), descricao=escape(str(r.descricao)),
+                         frota=escape(str(r.frota_vinculada or "Geral")), prazo=prazo)
+
+
+@medir('exportacao')
+def escrever_relatorio_html(df_pen, saida, hoje=None):
+    # `saida`: lista (append) ou qualquer objeto com write() (io.StringIO, arquivo aberto)
+    hoje = hoje or date.today()
+    escrever = saida.append if isinstance(saida, list) else saida.write
+    escrever(PAGINA.substitute(data=hoje.strftime('%d/%m/%Y')))
+    classes, br = classificar_prazos(df_pen, hoje)
+    df = df_pen.assign(classe_prazo=classes, prazo_br=br)
+    tem_versao = 'versao' in df.columns
+    for status, classe_col in COLUNAS:
+        escrever(COLUNA.format(classe=classe_col, status=status))
+        for r in df[df['status'] == status].itertuples(index=False):
+            vencido = r.classe_prazo == 'atrasada'
+            if tem_versao:
+                escrever(_fragmentos.obter((r.id, r.versao, vencido), lambda: _cartao(r, vencido)))
+            else:
+                escrever(_cartao(r, vencido))
+        escrever("</div>")
+    escrever("</div></body></html>")
+
+
+def gerar_relatorio_visual_html(df_pen, hoje=None):
+    partes = []
+    escrever_relatorio_html(df_pen, partes, hoje)
+    return ''.join(partes)
@@ -0,0 +1,193 @@
+import argparse
+import os
+import re
+from datetime import date
+
+import pandas as pd
+from fpdf import FPDF
+
+from instrumentacao import medir
+from kanban import classificar_prazos
+
+# --- RELATÓRIOS EM PDF (FPDF) ---
+# Só fontes core (Helvetica): não há arquivo de fonte para carregar/embutir, as métricas
+# já vêm do módulo do fpdf e são reaproveitadas por todos os documentos. O layout (larguras,
+# cores) é calculado uma vez aqui no módulo.
+PRIO_RGB = {"Alta": (255, 75, 75), "Média": (255, 164, 33), "Baixa": (33, 195, 84)}
+STATUS_KANBAN = (("A Fazer", (255, 255, 255)), ("Fazendo", (214, 234, 248)), ("Feito", (213, 245, 227)))
+# (título, largura mm) — paisagem A4, 277 mm úteis
+COLS_KANBAN = (("Prio.", 16), ("Título", 60), ("Descrição", 101), ("Responsável", 40), ("Frota", 30), ("Prazo", 30))
+COLS_LOTE = (("Frota", 30), ("Modelo", 45), ("Responsável", 45), ("Status", 40), ("Progresso", 117))
+ALTURA_LINHA = 7
+
+
+def _latin1(txt, padrao=""):
+    # Fontes core só cobrem latin-1: acentos passam, emojis e afins são descartados
+    if txt is None or (not isinstance(txt, str) and pd.isna(txt)) or txt == "": txt = padrao
+    return str(txt).encode('latin-1', 'ignore').decode('latin-1').strip()
+
+
+def _hex_rgb(cor, padrao=(149, 165, 166)):
+    m = re.fullmatch(r'#?([0-9a-fA-F]{6})', str(cor or ''))
+    return tuple(int(m.group(1)[i:i + 2], 16) for i in (0, 2, 4)) if m else padrao
+
+
+class RelatorioPDF(FPDF):
+    def __init__(self, titulo):
+        super().__init__(orientation='L', unit='mm', format='A4')
+        self.titulo = _latin1(titulo)
+        self.set_auto_page_break(True, margin=12)
+        self.set_margins(10, 10, 10)
+        self.alias_nb_pages()
+
+    def header(self):
+        self.set_fill_color(44, 62, 80)
+        self.set_text_color(255, 255, 255)
+        self.set_font('Helvetica', 'B', 14)
+        self.cell(0, 10, self.titulo, 0, 1, 'C', True)
+        self.set_text_color(0, 0, 0)
+        self.ln(3)
+
+    def footer(self):
+        self.set_y(-10)
+        self.set_font('Helvetica', '', 8)
+        self.set_text_color(120, 120, 120)
+        self.cell(0, 5, f"Gerado em {date.today().strftime('%d/%m/%Y')} - Página {self.page_no()}/{{nb}}", 0, 0, 'R')
+
+    def cortar(self, txt, largura, padrao=""):
+        txt = _latin1(txt, padrao)
+        if self.get_string_width(txt) <= largura - 2:
+            return txt
+        while txt and self.get_string_width(txt + '...') > largura - 2:
+            txt = txt[:-1]
+        return txt + '...'
+
+    def cabecalho_tabela(self, colunas, fundo=(224, 224, 224)):
+        self.set_font('Helvetica', 'B', 9)
+        self.set_fill_color(*fundo)
+        for nome, w in colunas:
+            self.cell(w, ALTURA_LINHA, nome, 1, 0, 'C', True)
+        self.ln()
+        self.set_font('Helvetica', '', 9)
+
+    def secao(self, texto, fundo):
+        self.set_font('Helvetica', 'B', 12)
+        self.set_fill_color(*fundo)
+        self.cell(0, 9, _latin1(texto), 'B', 1, 'L', True)
+        self.ln(1)
+
+    def quebra_se_preciso(self, altura, colunas=None):
+        if self.get_y() + altura > self.page_break_trigger:
+            self.add_page()
+            if colunas: self.cabecalho_tabela(colunas)
+
+    def bytes(self):
+        out = self.output(dest='S')
+        return out.encode('latin-1') if isinstance(out, str) else bytes(out)
+
+
+# --- KANBAN ---
+def _kanban(pdf, df_pen, hoje):
+    classes, br = classificar_prazos(df_pen, hoje)
+    df = df_pen.assign(classe_prazo=classes, prazo_txt=br)
+    for status, fundo in STATUS_KANBAN:
+        tarefas = df[df['status'] == status]
+        pdf.quebra_se_preciso(9 + 2 * ALTURA_LINHA)
+        pdf.secao(f"{status} ({len(tarefas)})", fundo)
+        pdf.cabecalho_tabela(COLS_KANBAN)
+        for r in tarefas.itertuples(index=False):
+            pdf.quebra_se_preciso(ALTURA_LINHA, COLS_KANBAN)
+            prio = _latin1(r.prioridade, "Baixa")
+            pdf.set_fill_color(*PRIO_RGB.get(prio, (204, 204, 204)))
+            pdf.set_text_color(255, 255, 255)
+            pdf.set_font('Helvetica', 'B', 8)
+            pdf.cell(COLS_KANBAN[0][1], ALTURA_LINHA, prio.upper(), 1, 0, 'C', True)
+            pdf.set_text_color(0, 0, 0)
+            pdf.set_font('Helvetica', 'B', 9)
+            pdf.cell(COLS_KANBAN[1][1], ALTURA_LINHA, pdf.cortar(r.titulo, COLS_KANBAN[1][1]), 1)
+            pdf.set_font('Helvetica', '', 9)
+            for (_, w), v, p in zip(COLS_KANBAN[2:5], (r.descricao, r.responsavel, r.frota_vinculada), ("", "", "Geral")):
+                pdf.cell(w, ALTURA_LINHA, pdf.cortar(v, w, p), 1)
+            if r.classe_prazo == 'atrasada': pdf.set_text_color(192, 57, 43)
+            pdf.cell(COLS_KANBAN[5][1], ALTURA_LINHA, r.prazo_txt, 1, 1, 'C')
+            pdf.set_text_color(0, 0, 0)
+        pdf.ln(4)
+
+
+@medir('exportacao')
+def pdf_kanban(df_pen, titulo="Relatório de Pendências (Kanban)", hoje=None):
+    pdf = RelatorioPDF(titulo)
+    pdf.add_page()
+    _kanban(pdf, df_pen, hoje or date.today())
+    return pdf.bytes()
+
+
+# --- PROGRESSO POR LOTE ---
+def _lote(pdf, lote, df_l, cores):
+    pdf.quebra_se_preciso(9 + 3 * ALTURA_LINHA)
+    prontas = int((df_l['status'] == 'Concluído').sum())
+    media = df_l['progresso'].mean()
+    pdf.secao(f"{lote}  -  {len(df_l)} máquinas | {prontas} prontas | andamento {media:.0f}%", (236, 240, 241))
+    pdf.cabecalho_tabela(COLS_LOTE)
+    w_barra = COLS_LOTE[4][1]
+    df_l = df_l.assign(prog=df_l['progresso'].fillna(0).clip(0, 100).astype(int)).sort_values('progresso')
+    for r in df_l.itertuples(index=False):
+        pdf.quebra_se_preciso(ALTURA_LINHA, COLS_LOTE)
+        for (_, w), v in zip(COLS_LOTE[:4], (r.frota, r.modelo, r.responsavel, r.status)):
+            pdf.cell(w, ALTURA_LINHA, pdf.cortar(v, w), 1)
+        x, y = pdf.get_x(), pdf.get_y()
+        pdf.cell(w_barra, ALTURA_LINHA, '', 1)
+        prog = r.prog
+        if prog:
+            pdf.set_fill_color(*_hex_rgb(cores.get(r.status)))
+            pdf.rect(x + 1, y + 1.5, (w_barra - 16) * prog / 100, ALTURA_LINHA - 3, 'F')
+        pdf.set_xy(x + w_barra - 15, y)
+        pdf.cell(14, ALTURA_LINHA, f"{prog}%", 0, 1, 'R')
+    pdf.ln(4)
+
+
+@medir('exportacao')
+def pdf_lotes(df_ref, cores, lotes=None, titulo="Progresso das Máquinas por Lote"):
+    # Uma seção por lote no mesmo documento (todos os lotes se `lotes` for None)
+    pdf = RelatorioPDF(titulo)
+    pdf.add_page()
+    lotes = lotes if lotes is not None else sorted(df_ref['lote'].dropna().unique(), key=str)
+    for lote in lotes:
+        df_l = df_ref[df_ref['lote'] == lote]
+        if not df_l.empty: _lote(pdf, lote, df_l, cores)
+    return pdf.bytes()
+
+
+# --- LINHA DE COMANDO ---
+# uso: python relatorio_pdf.py [--saida relatorios]
+def _nome_arquivo(txt):
+    return re.sub(r'[^\w.-]+', '_', _latin1(txt)).strip('_') or 'sem_nome'
+
+
+def gerar_todos(saida):
+    # Uma passada: carrega as tabelas uma vez e grava um Kanban por gestor mais o relatório de lotes
+    from dados import carregar_dados, carregar_cores_status
+    from migracoes import garantir_esquema
+    from prazos import carregar_pendencias_prazos
+    garantir_esquema()
+    os.makedirs(saida, exist_ok=True)
+    hoje, gerados = date.today(), []
+    df_pen, df_ref, cores = carregar_pendencias_prazos(hoje.isoformat()), carregar_dados(), carregar_cores_status()
+    for gestor, df_g in df_pen.groupby(df_pen['responsavel'].fillna('Sem responsável')):
+        caminho = os.path.join(saida, f"Kanban_{_nome_arquivo(gestor)}_{hoje}.pdf")
+        with open(caminho, 'wb') as f:
+            f.write(pdf_kanban(df_g, f"Pendências - {gestor}", hoje))
+        gerados.append(caminho)
+    if not df_ref.empty:
+        caminho = os.path.join(saida, f"Lotes_{hoje}.pdf")
+        with open(caminho, 'wb') as f:
+            f.write(pdf_lotes(df_ref, cores))
+        gerados.append(caminho)
+    return gerados
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description="Gera os relatórios PDF de todos os gestores e lotes.")
+    ap.add_argument('--saida', default='relatorios', help="pasta de destino (padrão: relatorios)")
+    for caminho in gerar_todos(ap.parse_args().saida):
+        print(caminho)
@@ -0,0 +1,100 @@
+import threading
+
+import pandas as pd
+
+from db import conexao
+from migracoes import TABELAS_RASTREADAS
+
+
+# --- API DE DELTA ---
+def _ler(conn, sql, params=()):
+    return pd.read_sql(sql, conn, params=params)
+
+
+def versao_atual(tabela, conn=None):
+    sql = "SELECT coalesce(max(seq), 0) FROM log_alteracoes WHERE tabela=?"
+    if conn is not None:
+        return conn.execute(sql, (tabela,)).fetchone()[0]
+    with conexao() as cn:
+        return cn.execute(sql, (tabela,)).fetchone()[0]
+
+
+def carga_completa(tabela):
+    # Lê versão e linhas no mesmo snapshot de leitura (WAL), sem janela para perder alterações
+    assert tabela in TABELAS_RASTREADAS
+    with conexao() as conn:
+        conn.execute("BEGIN")
+        try:
+            v = versao_atual(tabela, conn)
+            df = _ler(conn, f"SELECT * FROM {tabela}")
+        finally:
+            conn.rollback()
+    return v, df
+
+
+def alteracoes_desde(tabela, versao):
+    # Devolve (nova_versao, linhas inseridas/alteradas, ids removidos) desde `versao`
+    assert tabela in TABELAS_RASTREADAS
+    with conexao() as conn:
+        conn.execute("BEGIN")
+        try:
+            v = versao_atual(tabela, conn)
+            if v == versao:
+                return v, None, []
+            alteradas = _ler(conn, f"""SELECT t.* FROM log_alteracoes l JOIN {tabela} t ON t.id = l.linha_id
+                                      WHERE l.tabela=? AND l.seq>? AND l.operacao<>'D'""", (tabela, versao))
+            removidos = [r[0] for r in conn.execute(
+                "SELECT linha_id FROM log_alteracoes WHERE tabela=? AND seq>? AND operacao='D'", (tabela, versao))]
+        finally:
+            conn.rollback()
+    return v, alteradas, removidos
+
+
+# --- ESPELHO EM MEMÓRIA ---
+class Espelho:
+    # Cópia da tabela compartilhada pelo processo, atualizada só com o delta desde a última
+    # leitura. Mantém a versão de cada grupo (ex.: lote) para quem desenha só o que mudou.
+    # O DataFrame é substituído a cada atualização, nunca alterado in-place.
+    def __init__(self, tabela, coluna_grupo=None):
+        self.tabela = tabela
+        self.coluna_grupo = coluna_grupo
+        self.versao = None
+        self.df = None
+        self.versao_grupo = {}
+        self._lock = threading.Lock()
+
+    def _marcar_grupos(self, linhas, v):
+        if self.coluna_grupo is None or linhas is None or linhas.empty:
+            return
+        for g in linhas[self.coluna_grupo].unique():
+            self.versao_grupo[g] = v
+
+    def atualizar(self):
+        with self._lock:
+            if self.df is None:
+                self.versao, df = carga_completa(self.tabela)
+                self.df = df.set_index('id', drop=False)
+                return self.df
+            v, alteradas, removidos = alteracoes_desde(self.tabela, self.versao)
+            if v == self.versao:
+                return self.df
+            ids = list(alteradas['id']) + removidos
+            antigas = self.df[self.df.index.isin(ids)]
+            self._marcar_grupos(antigas, v)
+            self._marcar_grupos(alteradas, v)
+            base = self.df.drop(index=antigas.index)
+            novas = alteradas.set_index('id', drop=False)
+            self.df = pd.concat([base, novas]).sort_index() if not novas.empty else base
+            self.versao = v
+            return self.df
+
+
+_espelhos = {}
+_espelhos_lock = threading.Lock()
+
+
+def espelho(tabela, coluna_grupo=None):
+    with _espelhos_lock:
+        if tabela not in _espelhos:
+            _espelhos[tabela] = Espelho(tabela, coluna_grupo)
+        return _espelhos[tabela]
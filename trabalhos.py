@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+import instrumentacao as instr
+from db import conexao, seqs_log, transacao
+
+# --- TRABALHOS EM SEGUNDO PLANO ---
+# Exportações e relatórios rodam num pool de threads do processo, fora do rerun do Streamlit.
+# A tabela trabalhos (migração 8) guarda estado, progresso e o arquivo gerado. Um pedido igual
+# (mesmo tipo, parâmetros e versão dos dados) reaproveita o trabalho em andamento ou o arquivo
+# pronto: vários usuários clicando em "Excel" ao mesmo tempo geram um arquivo só.
+TRABALHADORES = 2
+PASTA_ARTEFATOS = os.path.join('relatorios', 'trabalhos')
+RETENCAO_HORAS = 24  # arquivos prontos ficam disponíveis para baixar de novo por esse tempo
+SEM_SINAL_S = 600  # ativo sem atualização há mais que isso: o processo que rodava caiu
+INTERVALO_PROGRESSO_S = 0.5
+# tabelas que os relatórios leem: a versão delas (max(seq) do log_alteracoes, igual em todos os
+# processos) entra na chave do pedido
+TABELAS_DADOS = ('reformas', 'pendencias', 'gestores', 'status_config')
+
+# tipo -> (função(caminho, params, progresso), extensão, mime, prefixo do nome do arquivo)
+TIPOS = {}
+
+
+def tipo(nome, extensao, mime, prefixo):
+    def registrar(func):
+        TIPOS[nome] = (func, extensao, mime, prefixo)
+        return func
+    return registrar
+
+
+def _agora():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+# --- TIPOS DE TRABALHO ---
+@tipo('excel', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'Reforma')
+def _excel(caminho, params, progresso):
+    from exportacao import exportar_excel
+    exportar_excel(caminho, params.get('inicio'), params.get('fim'), params.get('lotes'),
+                   progresso=lambda feitas, total: progresso(feitas / total if total else 1.0))
+
+
+@tipo('kanban_pdf', 'pdf', 'application/pdf', 'Relatorio_Visual')
+def _kanban_pdf(caminho, params, progresso):
+    from prazos import carregar_pendencias_prazos
+    from relatorio_pdf import pdf_kanban
+    df = carregar_pendencias_prazos(params['hoje'])
+    progresso(0.3)
+    with open(caminho, 'wb') as f:
+        f.write(pdf_kanban(df, hoje=date.fromisoformat(params['hoje'])))
+
+
+@tipo('kanban_html', 'html', 'text/html', 'Relatorio_Visual')
+def _kanban_html(caminho, params, progresso):
+    from prazos import carregar_pendencias_prazos
+    from relatorio import escrever_relatorio_html
+    df = carregar_pendencias_prazos(params['hoje'])
+    progresso(0.3)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        escrever_relatorio_html(df, f, date.fromisoformat(params['hoje']))
+
+
+@tipo('lotes_pdf', 'pdf', 'application/pdf', 'Progresso_Lotes')
+def _lotes_pdf(caminho, params, progresso):
+    from dados import carregar_dados, carregar_cores_status
+    from relatorio_pdf import pdf_lotes
+    df = carregar_dados()
+    progresso(0.3)
+    with open(caminho, 'wb') as f:
+        f.write(pdf_lotes(df, carregar_cores_status()))
+
+
+# --- EXECUTOR ---
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(TRABALHADORES, thread_name_prefix='trabalho')
+    return _executor
+
+
+def _atualizar(id_t, **campos):
+    campos['atualizado_em'] = _agora()
+    with transacao() as c:
+        c.execute(f"UPDATE trabalhos SET {', '.join(f'{k}=?' for k in campos)} WHERE id=?",
+                  list(campos.values()) + [id_t])
+
+
+def _rodar(id_t, nome, params):
+    func, extensao, _, prefixo = TIPOS[nome]
+    os.makedirs(PASTA_ARTEFATOS, exist_ok=True)
+    final = os.path.join(PASTA_ARTEFATOS, f"{id_t}.{extensao}")
+    parcial = final + '.parcial'
+    ultimo = [0.0]
+
+    def progresso(frac):
+        # grava no máximo a cada INTERVALO_PROGRESSO_S para não disputar o lock de escrita
+        if time.monotonic() - ultimo[0] >= INTERVALO_PROGRESSO_S:
+            ultimo[0] = time.monotonic()
+            _atualizar(id_t, progresso=min(max(frac, 0.0), 1.0))
+
+    try:
+        with instr.coleta(f"trabalho {nome} #{id_t}"):
+            _atualizar(id_t, estado='rodando')
+            func(parcial, params, progresso)
+        os.replace(parcial, final)
+    except Exception as e:
+        if os.path.exists(parcial): os.remove(parcial)
+        _atualizar(id_t, estado='erro', mensagem=f"{type(e).__name__}: {e}")
+    else:
+        _atualizar(id_t, estado='pronto', progresso=1.0, arquivo=final,
+                   nome_arquivo=f"{prefixo}_{date.today()}.{extensao}")
+
+
+def _limpar(c):
+    # Ativos sem sinal viram erro; prontos antigos perdem o arquivo
+    limite_ativo = (datetime.now() - timedelta(seconds=SEM_SINAL_S)).isoformat(timespec='seconds')
+    c.execute("UPDATE trabalhos SET estado='erro', mensagem='interrompido' "
+              "WHERE estado IN ('fila', 'rodando') AND atualizado_em < ?", (limite_ativo,))
+    limite = (datetime.now() - timedelta(hours=RETENCAO_HORAS)).isoformat(timespec='seconds')
+    for id_t, arquivo in c.execute("SELECT id, arquivo FROM trabalhos WHERE atualizado_em < ?", (limite,)).fetchall():
+        if arquivo and os.path.exists(arquivo): os.remove(arquivo)
+    c.execute("DELETE FROM trabalhos WHERE atualizado_em < ?", (limite,))
+
+
+# --- API ---
+def enviar(nome, **params):
+    # Devolve o id do trabalho: um igual já ativo ou pronto é reaproveitado, senão entra na fila.
+    # BEGIN IMMEDIATE serializa a checagem, então pedidos simultâneos (threads ou processos) não duplicam.
+    assert nome in TIPOS
+    with transacao() as c:
+        seqs = seqs_log(c)
+        chave = json.dumps([nome, params, [seqs.get(t, 0) for t in TABELAS_DADOS]], sort_keys=True, default=str)
+        _limpar(c)
+        for id_t, estado, arquivo in c.execute(
+                "SELECT id, estado, arquivo FROM trabalhos WHERE chave=? AND estado IN ('fila', 'rodando', 'pronto') "
+                "ORDER BY id DESC", (chave,)).fetchall():
+            if estado != 'pronto' or os.path.exists(arquivo):
+                return id_t
+        agora = _agora()
+        id_t = c.execute("INSERT INTO trabalhos (tipo, chave, estado, criado_em, atualizado_em) VALUES (?,?,'fila',?,?)",
+                         (nome, chave, agora, agora)).lastrowid
+    get_executor().submit(_rodar, id_t, nome, params)
+    return id_t
+
+
+def situacao(ids):
+    # Uma linha por trabalho (id, tipo, estado, progresso, mensagem, nome_arquivo, mime), na ordem de `ids`
+    if not ids:
+        return pd.DataFrame(columns=['id', 'tipo', 'estado', 'progresso', 'mensagem', 'nome_arquivo', 'mime'])
+    with conexao() as conn:
+        df = pd.read_sql("SELECT id, tipo, estado, progresso, mensagem, nome_arquivo FROM trabalhos "
+                         "WHERE id IN (SELECT value FROM json_each(?))", conn, params=(json.dumps(list(ids)),))
+    df['mime'] = df['tipo'].map(lambda t: TIPOS[t][2] if t in TIPOS else None)
+    ordem = {i: n for n, i in enumerate(ids)}
+    return df.sort_values('id', key=lambda s: s.map(ordem)).reset_index(drop=True)
+
+
+def ler_artefato(id_t):
+    with conexao() as conn:
+        linha = conn.execute("SELECT arquivo FROM trabalhos WHERE id=? AND estado='pronto'", (id_t,)).fetchone()
+    if not linha or not os.path.exists(linha[0]):
+        return None
+    with open(linha[0], 'rb') as f:
+        return f.read()